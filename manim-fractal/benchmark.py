@@ -0,0 +1,163 @@
+# --- Mandelbrot Renderer Benchmark ---
+# Times the fractal compute and coloring paths of fractal_core without rendering
+# any Manim scene. Every FAMOUS_LOCATIONS entry is computed once per backend, resolution
+# and max_iter, then colored with every color algorithm. Results go to a JSON file so runs
+# can be compared across backends and commits.
+#
+# It also times a cold `import fractal_core` in a fresh interpreter and exits with status 1
+# if that takes longer than IMPORT_BUDGET_S or pulls in Manim, so CI runs of the benchmark
+# catch regressions in worker startup.
+#
+# Usage: python benchmark.py --backends numpy,jit --res 200,400 --max-iter 200,1000
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import fractal_core as core
+
+COLOR_ALGOS = [
+    core.get_smooth_color, core.get_histogram_color, core.get_escape_time_color,
+    core.get_palette_cycle_color, core.get_orbit_trap_color, core.get_distance_estimation_color,
+]
+BACKENDS = ["scalar", "numpy", "parallel", "jit"]
+IMPORT_BUDGET_S = 0.5
+
+def import_seconds(runs=3):
+    """Best-of-`runs` wall time of importing fractal_core in a fresh interpreter.
+
+    Raises RuntimeError if the import loads manim."""
+    probe = ("import sys, time; t = time.perf_counter(); import fractal_core; "
+             "print(time.perf_counter() - t, 'manim' in sys.modules)")
+    best = None
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__))).stdout.split()
+        if out[1] == "True":
+            raise RuntimeError("importing fractal_core loaded manim")
+        best = float(out[0]) if best is None else min(best, float(out[0]))
+    return best
+
+def scalar_field(c, max_iter):
+    """Reference field built pixel by pixel from the original scalar kernels."""
+    field = np.zeros(c.shape, dtype=core.FIELD_DTYPE)
+    for y in range(c.shape[0]):
+        for x in range(c.shape[1]):
+            px = complex(c[y, x])
+            m, z, dz = core.mandelbrot_distance_estimation(px, max_iter)
+            _, trap = core.mandelbrot_orbit_trap(px, max_iter)
+            field[y, x] = (m, trap, z, dz)
+    return field
+
+def compute(backend, renderer, center, zoom, res, max_iter, stats):
+    if backend == "scalar":
+        return scalar_field(core.complex_plane(center, zoom, res), max_iter)
+    if backend == "parallel":
+        field = renderer.compute_field(center, zoom)
+        stats.update(renderer.kernel_stats)
+        return field
+    return core.mandelbrot_field(core.complex_plane(center, zoom, res), max_iter, stats=stats, backend=backend)
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def run(backends, resolutions, max_iters, locations, workers, repeat):
+    records = []
+    for backend in backends:
+        if backend == "jit" and not core.jit_available():
+            print("skipping jit backend: numba is not available", file=sys.stderr)
+            continue
+        for res in resolutions:
+            for max_iter in max_iters:
+                # One renderer per configuration so the process pool is started once, not per location.
+                # Its workers run the NumPy kernel, so "parallel" compares directly with "numpy".
+                renderer = (core.MandelbrotRenderer(res, max_iter, workers=workers, backend="numpy")
+                            if backend == "parallel" else None)
+                for index in locations:
+                    center, zoom, label = core.FAMOUS_LOCATIONS[index][:3]
+                    if backend != "scalar":
+                        # Untimed warm-up: pool startup and JIT compilation are not part of the steady state
+                        compute(backend, renderer, center, zoom, res, max_iter, {})
+                    best, stats, field = None, {}, None
+                    for _ in range(repeat):
+                        stats = {}
+                        start = time.perf_counter()
+                        field = compute(backend, renderer, center, zoom, res, max_iter, stats)
+                        elapsed = time.perf_counter() - start
+                        best = elapsed if best is None else min(best, elapsed)
+                    # Memory is measured in a separate run, since tracemalloc slows down every
+                    # allocation. It only sees this process, so it cannot measure the pool
+                    # workers of "parallel" (peak_bytes is None there).
+                    peak = None
+                    if backend != "parallel":
+                        tracemalloc.start()
+                        compute(backend, renderer, center, zoom, res, max_iter, {})
+                        peak = tracemalloc.get_traced_memory()[1]
+                        tracemalloc.stop()
+                    # The scalar reference iterates every pixel up to its escape count; the
+                    # kernels report the iterations they ran, which the shortcuts reduce.
+                    iterations = (int(field["iters"].astype(np.int64).sum()) if backend == "scalar"
+                                  else stats["iterations"])
+                    for color_func in COLOR_ALGOS:
+                        start = time.perf_counter()
+                        core.colorize_field(field, color_func, max_iter)
+                        colorize = time.perf_counter() - start
+                        records.append({
+                            "backend": backend, "location": label, "color": color_func.__name__,
+                            "res": res, "max_iter": max_iter,
+                            "compute_s": best, "colorize_s": colorize,
+                            "megapixels_per_s": res * res / 1e6 / (best + colorize),
+                            "iterations_per_s": iterations / best,
+                            "peak_bytes": peak, "kernel_peak_bytes": stats.get("peak_bytes"),
+                        })
+                    print(f"{backend:>8} {res:>5}px {max_iter:>6} iter  {label:<20} "
+                          f"{best:8.3f}s  {iterations / best / 1e6:8.1f} Miter/s  "
+                          + (f"{peak / 2**20:7.1f} MiB" if peak is not None else "    n/a MiB"))
+                if renderer is not None:
+                    renderer.close()
+    return records
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Mandelbrot renderer without Manim scene rendering.")
+    parser.add_argument("--backends", default="numpy,parallel,jit",
+                        help=f"comma-separated subset of {','.join(BACKENDS)}")
+    parser.add_argument("--res", default="200,400", help="comma-separated resolutions")
+    parser.add_argument("--max-iter", default="200,1000", help="comma-separated max_iter values")
+    parser.add_argument("--locations", default=None, help="comma-separated FAMOUS_LOCATIONS indices (default: all)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="process count for the parallel backend")
+    parser.add_argument("--repeat", type=int, default=1, help="compute repetitions per case (best time is kept)")
+    parser.add_argument("--output", default="bench_results.json", help="where to write the JSON results")
+    args = parser.parse_args(argv)
+
+    backends = args.backends.split(",")
+    unknown = set(backends) - set(BACKENDS)
+    if unknown:
+        parser.error(f"unknown backend(s): {', '.join(sorted(unknown))}")
+    locations = ([int(i) for i in args.locations.split(",")] if args.locations
+                 else list(range(len(core.FAMOUS_LOCATIONS))))
+    import_s = import_seconds()
+    print(f"import fractal_core: {import_s * 1000:.0f} ms (budget {IMPORT_BUDGET_S * 1000:.0f} ms)")
+    records = run(backends, [int(r) for r in args.res.split(",")], [int(m) for m in args.max_iter.split(",")],
+                  locations, args.workers, args.repeat)
+    with open(args.output, "w") as f:
+        json.dump({
+            "commit": git_commit(), "python": platform.python_version(), "numpy": np.__version__,
+            "cpu_count": os.cpu_count(), "import_s": import_s, "results": records,
+        }, f, indent=2)
+    print(f"wrote {len(records)} results to {args.output}")
+    if import_s > IMPORT_BUDGET_S:
+        sys.exit(f"import fractal_core took {import_s:.3f}s, over the {IMPORT_BUDGET_S}s budget")
+
+if __name__ == "__main__":
+    main()
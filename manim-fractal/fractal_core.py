@@ -0,0 +1,1615 @@
+# --- Fractal Compute Core ---
+# Escape-time kernels, colorizers, caches and the renderer core behind the Manim scenes,
+# importing nothing but NumPy (numba is imported lazily the first time the JIT backend
+# is used). Colors are plain RGB triples in [0, 1]. Headless tools and process-pool
+# workers import this module directly and never pay for Manim's startup.
+
+import decimal
+import functools
+import hashlib
+import importlib.util
+import json
+import math
+import multiprocessing
+import os
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+# --- CONFIGURABLE PARAMETERS ---
+MAX_ITER = 200
+ZOOM_STEPS = 12
+RESOLUTION = 400
+FIELD_CACHE_DIR = "media/fractal_cache"
+FIELD_CACHE_MAX_BYTES = 256 * 2**20  # size cap of FieldCache's in-memory tier
+PYRAMID_DIR = "media/fractal_pyramid"
+PYRAMID_TILE = 64          # pixels per side of a tile-pyramid tile
+PYRAMID_MAX_BYTES = 512 * 2**20  # size cap of the memory-mapped tile store
+TOUR_PYRAMID = False       # serve the scene's tour views from the tile pyramid in PYRAMID_DIR
+DEEP_ZOOM_ULPS = 1024      # float64 steps per pixel below which the renderer switches to perturbation
+MIN_RECT_SIZE = 8          # Mariani-Silver stops subdividing below this many pixels
+PREFETCH_WORKERS = 2       # background threads rendering upcoming tour frames
+PREFETCH_DEPTH = 6         # how many frames may be rendered ahead of the scene
+PREFETCH_MAX_BYTES = 256 * 2**20  # cap on finished-but-unshown frames held in memory
+AA_SAMPLES = 3             # NxN jittered subsamples per refined pixel (0 disables)
+AA_THRESHOLD = 4           # escape-count jump between neighbours that marks an edge pixel
+JULIA_STEPS = 120          # frames in the Julia dance
+JULIA_BATCH = 16           # Julia frames iterated together in one batched pass
+BUDDHA_BATCH = 2**16       # random c samples per Buddhabrot batch
+BUDDHA_JOB_BATCHES = 16    # batches a Buddhabrot worker runs before reporting back
+
+# --- PALETTE ---
+# Manim's standard colors as RGB, so colors here match the scene's exactly.
+def hex_to_rgb(hex_color):
+    return tuple(int(hex_color[i:i + 2], 16) / 255 for i in (1, 3, 5))
+
+BLUE = hex_to_rgb("#58C4DD")
+TEAL = hex_to_rgb("#5CD0B3")
+GREEN = hex_to_rgb("#83C167")
+YELLOW = hex_to_rgb("#FFFF00")
+ORANGE = hex_to_rgb("#FF862F")
+RED = hex_to_rgb("#FC6255")
+PINK = hex_to_rgb("#D147BD")
+PURPLE = hex_to_rgb("#9A72AC")
+WHITE = (1.0, 1.0, 1.0)
+
+def interpolate_rgb(start, end, alpha):
+    """Linear blend of two RGB colors, as manim.interpolate_color does."""
+    return np.asarray(start) * (1 - alpha) + np.asarray(end) * alpha
+
+# --- FAMOUS MANDELBROT LOCATIONS (center, zoom, label, color, highlight) ---
+FAMOUS_LOCATIONS = [
+    (complex(-0.75, 0), 1.0, "The Main Cardioid", GREEN, None),
+    (complex(-1.25, 0.0), 10, "Elephant Valley", ORANGE, None),
+    (complex(-0.7453, 0.1127), 100, "Seahorse Valley", BLUE, (0.355, 0.355)),
+    (complex(-0.1011, 0.9563), 200, "Spiral Valley", TEAL, (0.0, 0.95)),
+    (complex(-1.749, 0), 500, "The Needle", RED, (-1.749, 0)),
+    (complex(-0.7435, 0.1314), 2000, "Mini Mandelbrot", PINK, (-0.7435, 0.1314)),
+    (complex(0.282, 0.01), 10000, "Satellite", YELLOW, (0.282, 0.01)),
+]
+
+# --- COLOR ALGORITHMS ---
+# Gradient endpoints shared by the per-pixel color functions and the LUT colorizer below.
+HISTOGRAM_GRADIENT = (PINK, YELLOW)
+ORBIT_TRAP_GRADIENT = (BLUE, YELLOW)
+DISTANCE_GRADIENT = (RED, WHITE)
+
+def get_smooth_color(val, max_iter):
+    if val == max_iter:
+        return (0.0, 0.0, 0.0)
+    return interpolate_rgb(BLUE, WHITE, (val % max_iter) / max_iter)
+
+def get_histogram_color(val, max_iter, histogram, total):
+    if val == max_iter:
+        return (0.0, 0.0, 0.0)
+    hue = sum(histogram[:val]) / total
+    return interpolate_rgb(*HISTOGRAM_GRADIENT, hue)
+
+def get_escape_time_color(val, max_iter):
+    if val == max_iter:
+        return (0.0, 0.0, 0.0)
+    palette = [BLUE, TEAL, GREEN, YELLOW, ORANGE, RED, PINK, WHITE]
+    idx = int(val) % len(palette)
+    return np.array(palette[idx])
+
+def get_palette_cycle_color(val, max_iter):
+    if val == max_iter:
+        return (0.0, 0.0, 0.0)
+    palette = [BLUE, TEAL, GREEN, YELLOW, ORANGE, RED, PINK, WHITE]
+    t = (val % max_iter) / max_iter
+    idx = int(t * (len(palette) - 1))
+    frac = (t * (len(palette) - 1)) % 1
+    return interpolate_rgb(palette[idx], palette[min(idx+1, len(palette)-1)], frac)
+
+def get_orbit_trap_color(val, max_iter, z_trap):
+    if val == max_iter:
+        return (0.0, 0.0, 0.0)
+    t = np.clip(z_trap, 0, 1)
+    return interpolate_rgb(*ORBIT_TRAP_GRADIENT, t)
+
+def get_distance_estimation_color(val, max_iter, z, dz):
+    if val == max_iter:
+        return (0.0, 0.0, 0.0)
+    d = abs(z) * np.log(abs(z)) / abs(dz) if abs(dz) > 0 else 0
+    t = np.clip(np.log1p(d), 0, 1)
+    return interpolate_rgb(*DISTANCE_GRADIENT, t)
+
+# --- MANDELBROT CALCULATION (EXTENDED) ---
+def mandelbrot(c, max_iter=MAX_ITER):
+    """Calculate the escape time for a given complex number c in the Mandelbrot set."""
+    z = 0
+    for n in range(max_iter):
+        if abs(z) > 2:
+            return n
+        z = z * z + c
+    return max_iter
+
+def mandelbrot_orbit_trap(c, max_iter=MAX_ITER):
+    """Calculate the escape time and minimum distance to the real axis for a given complex number c."""
+    z = 0
+    min_dist = 1e9
+    for n in range(max_iter):
+        min_dist = min(min_dist, abs(z.imag))
+        if abs(z) > 2:
+            return n, min_dist
+        z = z * z + c
+    return max_iter, min_dist
+
+def mandelbrot_distance_estimation(c, max_iter=MAX_ITER):
+    """Calculate the escape time, z value, and its derivative for a given complex number c."""
+    z = 0
+    dz = 0
+    for n in range(max_iter):
+        dz = 2 * z * dz + 1 if n > 0 else 1
+        if abs(z) > 2:
+            return n, z, dz
+        z = z * z + c
+    return max_iter, z, dz
+
+# --- VECTORIZED ESCAPE-TIME ENGINE ---
+# Whole-grid version of the kernels above. Every pixel is iterated at once and dropped
+# from the active set as soon as it escapes, so late iterations only touch the points
+# that are still running. The arithmetic is spelled out on real/imag parts in the same
+# order as Python's complex ops, so results match the scalar kernels exactly.
+
+# One fused pass fills all of these per pixel; every color algorithm reads from it.
+FIELD_DTYPE = np.dtype([
+    ("iters", np.int64),      # escape count, as returned by mandelbrot()
+    ("trap", np.float64),     # minimum |Im z|, as returned by mandelbrot_orbit_trap()
+    ("z", np.complex128),     # final z, as returned by mandelbrot_distance_estimation()
+    ("dz", np.complex128),    # final dz/dc, as returned by mandelbrot_distance_estimation()
+])
+
+# Compact mode stores the same fields at half the size (max_iter must fit in uint16).
+COMPACT_FIELD_DTYPE = np.dtype([
+    ("iters", np.uint16),
+    ("trap", np.float32),
+    ("z", np.complex64),
+    ("dz", np.complex64),
+])
+
+# In compact mode, views whose pixel spacing is at least this coarse are iterated in
+# float32; finer spacings need float64 to keep neighbouring pixels apart.
+SINGLE_PRECISION_MIN_SPACING = 2.0**-14
+
+def plane_shape(res):
+    """(height, width) of a view: res is an int for square views or a (height, width) pair.
+
+    A view always spans 3 / zoom vertically; wider views extend further left and right."""
+    return (int(res), int(res)) if np.isscalar(res) else (int(res[0]), int(res[1]))
+
+def choose_precision(zoom, res):
+    """float32 for shallow views, float64 once pixels get closer than float32 resolves."""
+    spacing = (1.5 / zoom) / (plane_shape(res)[0] / 2)
+    return np.float32 if spacing >= SINGLE_PRECISION_MIN_SPACING else np.float64
+
+def needs_perturbation(center, zoom, res, ulps=DEEP_ZOOM_ULPS):
+    """True when float64 c values can no longer resolve a view: a (re, im) decimal-string
+    center, or pixels fewer than `ulps` float64 steps apart at the center's magnitude
+    (at least 1, the scale of the orbits themselves)."""
+    if isinstance(center, tuple):
+        return True
+    spacing = (1.5 / zoom) / (plane_shape(res)[0] / 2)
+    return spacing < ulps * np.finfo(np.float64).eps * max(abs(center), 1.0)
+
+def merge_stats(stats, new):
+    """Accumulates kernel counters into `stats`; peak_bytes keeps the maximum."""
+    for name, value in new.items():
+        if name == "peak_bytes":
+            stats[name] = max(stats.get(name, 0), value)
+        else:
+            stats[name] = stats.get(name, 0) + value
+
+def complex_plane(center, zoom, res, window=None):
+    """Returns the grid of c values that render() samples, indexed [y, x].
+
+    window=(y0, y1, x0, x1) returns just that sub-rectangle, with identical values.
+    """
+    h, w = plane_shape(res)
+    y0, y1, x0, x1 = window if window is not None else (0, h, 0, w)
+    scale = 1.5 / zoom
+    re = center.real + (np.arange(x0, x1) - w/2) * scale / (h/2)
+    im = center.imag + (np.arange(y0, y1) - h/2) * scale / (h/2)
+    c = np.empty((y1 - y0, x1 - x0), dtype=np.complex128)
+    c.real = re[np.newaxis, :]
+    c.imag = im[:, np.newaxis]
+    return c
+
+def interior_masks(cr, ci):
+    """Analytic membership tests: (inside main cardioid, inside period-2 bulb)."""
+    xr = cr - 0.25
+    q = xr*xr + ci*ci
+    cardioid = q * (q + xr) <= 0.25 * ci*ci
+    bulb = (cr + 1)*(cr + 1) + ci*ci <= 0.0625
+    return cardioid, bulb & ~cardioid
+
+def mandelbrot_field(c, max_iter=MAX_ITER, shortcuts=True, stats=None, backend=None, compact=False,
+                     precision=np.float64, resume=None):
+    """Fused escape-time pass: returns a FIELD_DTYPE array with iters, trap, z and dz per point.
+
+    backend is "jit" or "numpy"; by default the JIT kernel is used when numba is
+    importable. Both produce identical fields. With shortcuts, points in the main
+    cardioid or period-2 bulb are resolved without iterating, and orbits that land
+    exactly on an earlier point (Brent cycle check) stop early. Escape counts and traps
+    are unchanged; z and dz of those interior points are left where the shortcut
+    stopped them. compact=True returns a COMPACT_FIELD_DTYPE array, and the NumPy engine
+    then iterates in `precision` (float32 or float64; the JIT loop always uses float64).
+    Pass a dict as `stats` to get the per-shortcut pixel counts, the number of
+    pixel iterations actually run ("iterations") and peak_bytes.
+
+    resume=(field, n) continues `field`, computed for the same c with max_iter=n, up to
+    max_iter: escaped pixels are copied and only the ones still running at n are
+    iterated further, from their stored z, dz and trap. Escape counts match a fresh run,
+    except for compact fields, whose z and dz are only stored in single precision."""
+    if resume is not None and max_iter < resume[1]:
+        raise ValueError(f"cannot resume a max_iter={resume[1]} field at max_iter={max_iter}")
+    if (backend or KERNEL_BACKEND) == "jit" and jit_available():
+        return _jit_mandelbrot_field(c, max_iter, shortcuts, stats, compact, resume)
+    c = np.asarray(c, dtype=np.complex128)
+    field = np.zeros(c.shape, dtype=COMPACT_FIELD_DTYPE if compact else FIELD_DTYPE)
+    flat = field.reshape(-1)
+    flat["iters"] = max_iter
+    flat["trap"] = 1e9
+    iters, trap, z_out, dz_out = flat["iters"], flat["trap"], flat["z"], flat["dz"]
+    cr = c.real.ravel().astype(precision)
+    ci = c.imag.ravel().astype(precision)
+    idx = np.arange(cr.size)
+    start = 0
+    if resume is not None:
+        prev, start = resume
+        prev = prev.reshape(-1)
+        flat[...] = prev
+        running = prev["iters"] == start
+        iters[running] = max_iter
+        idx, cr, ci = idx[running], cr[running], ci[running]
+    counts = {"cardioid": 0, "bulb": 0, "periodic": 0, "iterations": 0}
+    if shortcuts and max_iter > 0:
+        cardioid, bulb = interior_masks(cr, ci)
+        counts["cardioid"] = int(cardioid.sum())
+        counts["bulb"] = int(bulb.sum())
+        inside = cardioid | bulb
+        trap[idx[inside]] = 0.0  # min |Im z| over an orbit that starts at z = 0
+        keep = ~inside
+        idx, cr, ci = idx[keep], cr[keep], ci[keep]
+    zr, zi, dzr, dzi, saved_r, saved_i = (np.zeros_like(cr) for _ in range(6))
+    tr = np.full_like(cr, 1e9)
+    if resume is not None:
+        zr[...], zi[...] = prev["z"].real[idx], prev["z"].imag[idx]
+        dzr[...], dzi[...] = prev["dz"].real[idx], prev["dz"].imag[idx]
+        tr[...] = prev["trap"][idx]
+        saved_r[...], saved_i[...] = zr, zi
+    # Scratch space for the loop below, which updates everything in place; once pixels
+    # escape the active arrays shrink and the loop works on prefixes of these buffers.
+    buf_a, buf_b, buf_t = (np.empty_like(cr) for _ in range(3))
+    mask_a, mask_b = np.empty(cr.size, dtype=bool), np.empty(cr.size, dtype=bool)
+    counts["peak_bytes"] = field.nbytes + sum(arr.nbytes for arr in (
+        idx, cr, ci, zr, zi, dzr, dzi, saved_r, saved_i, tr, buf_a, buf_b, buf_t, mask_a, mask_b))
+
+    def finish(mask):
+        done = idx[mask]
+        z_out[done] = zr[mask] + 1j * zi[mask]
+        dz_out[done] = dzr[mask] + 1j * dzi[mask]
+        trap[done] = tr[mask]
+        keep = ~mask
+        return [arr[keep] for arr in (idx, cr, ci, zr, zi, dzr, dzi, saved_r, saved_i, tr)]
+
+    with np.errstate(over="ignore", invalid="ignore"):  # dz may overflow on long orbits
+        next_save = 2 * start if start else 1
+        for n in range(start, max_iter):
+            k = idx.size
+            if k == 0:
+                break
+            counts["iterations"] += k
+            a, b, t, hit, other = buf_a[:k], buf_b[:k], buf_t[:k], mask_a[:k], mask_b[:k]
+            if n > 0:
+                # dz = 2*z*dz + 1, in the same operation order as the scalar kernel
+                np.multiply(zr, 2, out=a); a *= dzr
+                np.multiply(zi, 2, out=b); b *= dzi
+                a -= b; a += 1
+                np.multiply(zr, 2, out=t); t *= dzi
+                np.multiply(zi, 2, out=b); b *= dzr
+                t += b
+                dzr[...] = a
+                dzi[...] = t
+            else:
+                dzr.fill(1)
+                dzi.fill(0)
+            np.abs(zi, out=a)
+            np.minimum(tr, a, out=tr)
+            np.hypot(zr, zi, out=a)
+            np.greater(a, 2, out=hit)
+            if hit.any():
+                iters[idx[hit]] = n
+                idx, cr, ci, zr, zi, dzr, dzi, saved_r, saved_i, tr = finish(hit)
+                k = idx.size
+                a, b, t, hit, other = buf_a[:k], buf_b[:k], buf_t[:k], mask_a[:k], mask_b[:k]
+            # z = z*z + c
+            np.multiply(zr, zr, out=a); np.multiply(zi, zi, out=b)
+            a -= b; a += cr
+            np.multiply(zr, zi, out=b); np.multiply(zi, zr, out=t)
+            b += t; b += ci
+            zr[...] = a
+            zi[...] = b
+            if shortcuts:
+                # An exact repeat means the float orbit cycles forever through points that
+                # have already passed the escape test, so it can never escape.
+                np.equal(zr, saved_r, out=hit)
+                np.equal(zi, saved_i, out=other)
+                hit &= other
+                if hit.any():
+                    counts["periodic"] += int(hit.sum())
+                    idx, cr, ci, zr, zi, dzr, dzi, saved_r, saved_i, tr = finish(hit)
+                if n + 1 == next_save:
+                    saved_r[...] = zr
+                    saved_i[...] = zi
+                    next_save *= 2
+        if idx.size:
+            z_out[idx] = zr + 1j * zi
+            dz_out[idx] = dzr + 1j * dzi
+            trap[idx] = tr
+    if stats is not None:
+        merge_stats(stats, counts)
+    return field
+
+# --- JIT KERNEL BACKEND ---
+# The same fused kernel as native loops, in fractal_jit.py. It is only imported (and
+# numba with it) the first time the JIT backend runs, so importing this module stays fast.
+# KERNEL_BACKEND starts out as "jit" whenever numba is installed; if numba then fails to
+# import, it switches to "numpy" and every later call uses the NumPy engine. Operations
+# are written in the same order as the NumPy engine so both backends agree bit for bit.
+KERNEL_BACKEND = "jit" if importlib.util.find_spec("numba") is not None else "numpy"
+_JIT_LOCK = threading.Lock()
+_TILE_WORKER = False  # set by init_pool_worker() in pool processes, which run the kernel single-threaded
+
+@functools.lru_cache(maxsize=None)
+def _jit_kernels():
+    global KERNEL_BACKEND
+    try:
+        from numba import get_num_threads
+        from fractal_jit import _jit_field_blocks, _jit_field_blocks_serial
+    except ImportError as exc:
+        warnings.warn(f"numba is installed but failed to import, using the NumPy kernel: {exc}")
+        KERNEL_BACKEND = "numpy"
+        return None
+    return _jit_field_blocks, _jit_field_blocks_serial, get_num_threads
+
+def jit_available():
+    """True if the JIT kernel can run; the first call imports numba."""
+    return KERNEL_BACKEND == "jit" and _jit_kernels() is not None
+
+def _jit_mandelbrot_field(c, max_iter, shortcuts, stats, compact=False, resume=None):
+    c = np.asarray(c, dtype=np.complex128)
+    flat = c.reshape(-1)
+    field = np.zeros(flat.shape, dtype=COMPACT_FIELD_DTYPE if compact else FIELD_DTYPE)
+    start = 0
+    if resume is not None:
+        prev, start = resume
+        field[...] = prev.reshape(-1)
+    cr, ci = np.ascontiguousarray(flat.real), np.ascontiguousarray(flat.imag)
+    parallel_blocks, serial_blocks, get_num_threads = _jit_kernels()
+    # One block per row of a 2-D view; flat input (Mariani-Silver borders, keyframe
+    # pixels, Buddhabrot samples) is cut into one block per thread.
+    block = max(1, c.shape[-1] if c.ndim > 1 else -(-flat.size // get_num_threads()))
+    counts = np.zeros((-(-flat.size // block), 4), dtype=np.int64)
+    kernel = serial_blocks if _TILE_WORKER else parallel_blocks
+    with _JIT_LOCK:
+        kernel(cr, ci, max_iter, shortcuts, start, block, field["iters"], field["trap"], field["z"], field["dz"],
+               counts)
+    if stats is not None:
+        new = {name: int(count) for name, count in
+               zip(("cardioid", "bulb", "periodic", "iterations"), counts.sum(axis=0))}
+        new["peak_bytes"] = field.nbytes + cr.nbytes + ci.nbytes + counts.nbytes
+        merge_stats(stats, new)
+    return field.reshape(c.shape)
+
+def mandelbrot_array(c, max_iter=MAX_ITER):
+    """Vectorized mandelbrot(): escape times for an array of complex numbers."""
+    return mandelbrot_field(c, max_iter)["iters"]
+
+def mandelbrot_orbit_trap_array(c, max_iter=MAX_ITER):
+    """Vectorized mandelbrot_orbit_trap(): escape times and minimum |Im z| per point."""
+    field = mandelbrot_field(c, max_iter)
+    return field["iters"], field["trap"]
+
+def mandelbrot_distance_estimation_array(c, max_iter=MAX_ITER):
+    """Vectorized mandelbrot_distance_estimation(): escape times, final z and dz per point."""
+    field = mandelbrot_field(c, max_iter, shortcuts=False)
+    return field["iters"], field["z"], field["dz"]
+
+def escape_histogram(field, max_iter):
+    """Counts of each escape time among escaped pixels, as used by get_histogram_color."""
+    iters = field["iters"]
+    return np.bincount(iters[iters < max_iter], minlength=max_iter + 1).astype(float)
+
+# --- LOOKUP-TABLE COLORIZER ---
+# Each color scheme is evaluated once per escape count into a (max_iter+1)x3 uint8 table,
+# and a whole frame is then colored with a single fancy-indexing lookup. Row max_iter is
+# the interior color. Continuous inputs (orbit trap, distance estimate) are quantized
+# onto the first max_iter rows of a gradient table of the same shape.
+def _to_rgb8(rgb):
+    return (np.array(rgb) * 255).astype(np.uint8)
+
+@functools.lru_cache(maxsize=None)
+def palette_lut(color_func, max_iter):
+    """Table of color_func(val, max_iter) for val in 0..max_iter."""
+    return np.array([_to_rgb8(color_func(val, max_iter)) for val in range(max_iter + 1)])
+
+@functools.lru_cache(maxsize=None)
+def gradient_lut(start, end, max_iter):
+    """max_iter evenly spaced steps from start to end, then black for the interior row."""
+    lut = np.zeros((max_iter + 1, 3), dtype=np.uint8)
+    steps = max(max_iter - 1, 1)
+    for k in range(max_iter):
+        lut[k] = _to_rgb8(interpolate_rgb(start, end, k / steps))
+    return lut
+
+def histogram_lut(histogram, total, max_iter):
+    """Histogram coloring table built from a cumulative sum instead of per-pixel sums."""
+    cumulative = np.concatenate(([0.0], np.cumsum(histogram)))
+    lut = np.zeros((max_iter + 1, 3), dtype=np.uint8)
+    for val in range(max_iter):
+        hue = cumulative[val] / total if total else 0.0
+        lut[val] = _to_rgb8(interpolate_rgb(*HISTOGRAM_GRADIENT, hue))
+    return lut
+
+def quantize_levels(t, iters, max_iter):
+    """Maps t in [0, 1] onto gradient_lut rows; interior pixels map to the black row."""
+    steps = max(max_iter - 1, 1)
+    idx = np.rint(np.clip(t, 0, 1) * steps).astype(np.int64)
+    return np.where(iters == max_iter, max_iter, np.minimum(idx, max_iter - 1))
+
+def distance_estimate(field, max_iter):
+    """|z| log|z| / |dz| for escaped pixels (0 where dz vanishes or the pixel is interior)."""
+    escaped = field["iters"] < max_iter
+    az = np.abs(field["z"])
+    adz = np.abs(field["dz"])
+    ok = escaped & (adz > 0)
+    d = np.zeros(field.shape)
+    d[ok] = az[ok] * np.log(az[ok]) / adz[ok]
+    return d
+
+def colorize_field(field, color_func, max_iter, histogram=None):
+    """Colors a FIELD_DTYPE array with one of the get_*_color schemes; returns uint8 RGB.
+
+    Histogram coloring normally uses the field's own histogram; pass `histogram` to color
+    extra samples of a frame with the frame's histogram instead."""
+    iters = field["iters"]
+    if color_func == get_histogram_color:
+        if histogram is None:
+            histogram = escape_histogram(field, max_iter)
+        lut = histogram_lut(histogram, np.sum(histogram), max_iter)
+        idx = iters
+    elif color_func == get_orbit_trap_color:
+        lut = gradient_lut(*ORBIT_TRAP_GRADIENT, max_iter)
+        idx = quantize_levels(field["trap"], iters, max_iter)
+    elif color_func == get_distance_estimation_color:
+        lut = gradient_lut(*DISTANCE_GRADIENT, max_iter)
+        idx = quantize_levels(np.log1p(distance_estimate(field, max_iter)), iters, max_iter)
+    else:
+        lut = palette_lut(color_func, max_iter)
+        idx = iters
+    return lut[idx]
+
+# --- ADAPTIVE ANTIALIASING ---
+# Aliasing only shows where the escape count changes sharply between neighbours, i.e.
+# along the set boundary and the tight bands around it. Those pixels are found from the
+# frame's own field and re-sampled on a jittered NxN subpixel grid, and their colors are
+# averaged. Everything else keeps its single sample, so the extra cost follows boundary
+# length rather than image area.
+def edge_mask(iters, max_iter, threshold=AA_THRESHOLD):
+    """Pixels whose escape count differs from a neighbour by >= threshold, or that border
+    on the interior."""
+    level = iters.astype(np.int64)
+    inside = iters == max_iter
+    edges = np.zeros(iters.shape, dtype=bool)
+    for axis in (0, 1):
+        jump = (np.abs(np.diff(level, axis=axis)) >= threshold) | (np.diff(inside, axis=axis) != 0)
+        before = [slice(None)] * 2
+        after = [slice(None)] * 2
+        before[axis] = slice(None, -1)
+        after[axis] = slice(1, None)
+        edges[tuple(before)] |= jump
+        edges[tuple(after)] |= jump
+    return edges
+
+def subpixel_offsets(samples, seed=0):
+    """samples**2 jittered (dx, dy) offsets inside a unit pixel, centered on 0."""
+    rng = np.random.default_rng(seed)
+    grid = (np.arange(samples) + 0.5) / samples - 0.5
+    dx, dy = np.meshgrid(grid, grid)
+    jitter = (rng.random((2, samples * samples)) - 0.5) / samples
+    return dx.ravel() + jitter[0], dy.ravel() + jitter[1]
+
+def antialias_rgb(rgb, field, center, zoom, max_iter, color_func, samples=AA_SAMPLES,
+                  threshold=AA_THRESHOLD, stats=None, histogram=None, backend=None):
+    """Returns rgb with edge pixels replaced by the mean color of samples x samples subsamples."""
+    res = field.shape[0]
+    edges = edge_mask(field["iters"], max_iter, threshold)
+    ys, xs = np.nonzero(edges)
+    if stats is not None:
+        stats["refined_pixels"] = stats.get("refined_pixels", 0) + int(ys.size)
+    if ys.size == 0:
+        return rgb
+    spacing = (1.5 / zoom) / (res / 2)
+    dx, dy = subpixel_offsets(samples)
+    pixels = complex_plane(center, zoom, field.shape)[ys, xs]
+    c = np.empty((ys.size, dx.size), dtype=np.complex128)
+    c.real = pixels.real[:, np.newaxis] + dx[np.newaxis, :] * spacing
+    c.imag = pixels.imag[:, np.newaxis] + dy[np.newaxis, :] * spacing
+    sub_field = mandelbrot_field(c, max_iter, backend=backend, compact=field.dtype == COMPACT_FIELD_DTYPE)
+    if histogram is None and color_func == get_histogram_color:
+        histogram = escape_histogram(field, max_iter)
+    sub_rgb = colorize_field(sub_field, color_func, max_iter, histogram=histogram)
+    out = rgb.copy()
+    out[ys, xs] = np.rint(sub_rgb.mean(axis=1)).astype(np.uint8)
+    return out
+
+# --- PARALLEL TILE ENGINE ---
+# The viewport is cut into small tiles that a process pool pulls from one shared queue,
+# so a worker that finishes cheap exterior tiles immediately takes the next one while
+# others are still grinding through tiles on the set boundary. Workers write straight
+# into a shared-memory FIELD_DTYPE buffer; only tile coordinates cross the pipe. Every
+# pixel runs the same mandelbrot_field() arithmetic, so output is bit-identical to serial.
+TILE_SIZE = 32
+
+def tile_windows(res, tile=TILE_SIZE):
+    """(y0, y1, x0, x1) windows covering an image of plane_shape(res)."""
+    h, w = plane_shape(res)
+    return [(y0, min(y0 + tile, h), x0, min(x0 + tile, w))
+            for y0 in range(0, h, tile) for x0 in range(0, w, tile)]
+
+def init_pool_worker():
+    """ProcessPoolExecutor initializer: a pool already runs one process per core, so the
+    JIT kernel runs single-threaded in each instead of starting a numba thread pool."""
+    global _TILE_WORKER
+    _TILE_WORKER = True
+
+def _field_tile(job):
+    shm_name, res, center, zoom, max_iter, window, compact, precision, backend = job
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        out = np.ndarray(plane_shape(res), dtype=COMPACT_FIELD_DTYPE if compact else FIELD_DTYPE, buffer=shm.buf)
+        y0, y1, x0, x1 = window
+        stats = {}
+        out[y0:y1, x0:x1] = mandelbrot_field(complex_plane(center, zoom, res, window), max_iter, stats=stats,
+                                             backend=backend, compact=compact, precision=precision)
+        del out
+    finally:
+        shm.close()
+    return stats
+
+def tile_pool(workers):
+    """A ProcessPoolExecutor for parallel_mandelbrot_field whose workers are started by a fork
+    server rather than forked from this process. RenderQueue threads share one pool, and a
+    worker forked while another thread holds a lock (numba's, or the shared-memory resource
+    tracker's) would inherit it locked and hang."""
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method),
+                               initializer=init_pool_worker)
+
+def parallel_mandelbrot_field(pool, center, zoom, res, max_iter=MAX_ITER, tile=TILE_SIZE, stats=None,
+                              compact=False, precision=np.float64, backend=None):
+    """Computes the field for a view across `pool` (a ProcessPoolExecutor).
+
+    Per-tile shortcut counts are summed into `stats` if a dict is given. Workers run the
+    `backend` kernel; the JIT kernel runs single-threaded there, one tile per process."""
+    dtype = COMPACT_FIELD_DTYPE if compact else FIELD_DTYPE
+    shape = plane_shape(res)
+    shm = shared_memory.SharedMemory(create=True, size=shape[0] * shape[1] * dtype.itemsize)
+    try:
+        jobs = [(shm.name, res, center, zoom, max_iter, w, compact, precision, backend)
+                for w in tile_windows(res, tile)]
+        for tile_stats in pool.map(_field_tile, jobs, chunksize=1):
+            if stats is not None:
+                merge_stats(stats, tile_stats)
+        field = np.ndarray(shape, dtype=dtype, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+    return field
+
+# --- PERTURBATION DEEP-ZOOM ENGINE ---
+# Past zoom ~1e13 neighbouring pixels share the same float64 c and the image collapses
+# into blocks. Here only one reference orbit Z_n, at the view center, is iterated in
+# arbitrary precision (decimal). Every pixel tracks its float64 offset from it,
+#     delta_{n+1} = (2 Z_n + delta_n) delta_n + delta_c,
+# so per-pixel cost stays at float64 speed. When a pixel's orbit gets closer to 0 than
+# its offset is large (the classic perturbation glitch) or the reference orbit runs out,
+# the pixel is rebased onto the start of the reference orbit (delta = z, n_ref = 0).
+# A deep center can be given as a (re, im) tuple of decimal strings.
+def _to_decimal_center(center):
+    if isinstance(center, tuple):
+        return decimal.Decimal(center[0]), decimal.Decimal(center[1])
+    return decimal.Decimal(center.real), decimal.Decimal(center.imag)
+
+def reference_orbit(center, max_iter=MAX_ITER, digits=None):
+    """Orbit of the center in `digits` significant digits, as float64 (re, im) arrays.
+
+    The orbit stops after the first point with |Z| > 2 (or after max_iter steps)."""
+    with decimal.localcontext() as ctx:
+        ctx.prec = digits or 30
+        cr, ci = _to_decimal_center(center)
+        zr = zi = decimal.Decimal(0)
+        orbit = [(0.0, 0.0)]
+        for _ in range(max_iter):
+            if zr * zr + zi * zi > 4:
+                break
+            zr, zi = zr * zr - zi * zi + cr, 2 * zr * zi + ci
+            orbit.append((float(zr), float(zi)))
+    orbit = np.array(orbit)
+    return orbit[:, 0].copy(), orbit[:, 1].copy()
+
+def perturbation_field(center, zoom, res, max_iter=MAX_ITER, stats=None, compact=False):
+    """FIELD_DTYPE array for a view, computed as float64 offsets from a reference orbit.
+
+    If a dict is passed as `stats`, the reference length, rebase count and pixel iterations
+    are stored in it."""
+    digits = max(30, int(math.log10(max(zoom, 1))) + 20)
+    ref_r, ref_i = reference_orbit(center, max_iter, digits)
+    last = ref_r.size - 1
+    scale = 1.5 / zoom
+    h, w = plane_shape(res)
+    offsets_x = (np.arange(w) - w/2) * scale / (h/2)
+    offsets_y = (np.arange(h) - h/2) * scale / (h/2)
+    dcr = np.broadcast_to(offsets_x[np.newaxis, :], (h, w)).ravel().copy()
+    dci = np.broadcast_to(offsets_y[:, np.newaxis], (h, w)).ravel().copy()
+
+    field = np.zeros((h, w), dtype=COMPACT_FIELD_DTYPE if compact else FIELD_DTYPE)
+    flat = field.reshape(-1)
+    flat["iters"] = max_iter
+    flat["trap"] = 1e9
+    trap = flat["trap"]
+    idx = np.arange(dcr.size)
+    m = np.zeros(dcr.size, dtype=np.int64)
+    dr = np.zeros_like(dcr)
+    di = np.zeros_like(dcr)
+    dzr = np.zeros_like(dcr)
+    dzi = np.zeros_like(dcr)
+    zr = zi = dr
+    rebases = iterations = 0
+    for n in range(max_iter):
+        if idx.size == 0:
+            break
+        iterations += idx.size
+        Zr, Zi = ref_r[m], ref_i[m]
+        zr, zi = Zr + dr, Zi + di
+        rebase = (np.hypot(zr, zi) < np.hypot(dr, di)) | (m == last)
+        if rebase.any():
+            rebases += int(rebase.sum())
+            dr, di = np.where(rebase, zr, dr), np.where(rebase, zi, di)
+            m = np.where(rebase, 0, m)
+            Zr, Zi = np.where(rebase, 0.0, Zr), np.where(rebase, 0.0, Zi)
+        if n > 0:
+            with np.errstate(over="ignore", invalid="ignore"):  # dz may overflow on long orbits
+                dzr, dzi = 2*zr*dzr - 2*zi*dzi + 1, 2*zr*dzi + 2*zi*dzr
+        else:
+            dzr = np.ones_like(zr)
+            dzi = np.zeros_like(zr)
+        trap[idx] = np.minimum(trap[idx], np.abs(zi))
+        escaped = np.hypot(zr, zi) > 2
+        if escaped.any():
+            done = idx[escaped]
+            flat["iters"][done] = n
+            flat["z"][done] = zr[escaped] + 1j * zi[escaped]
+            flat["dz"][done] = dzr[escaped] + 1j * dzi[escaped]
+            keep = ~escaped
+            idx, m, dr, di, dcr, dci = idx[keep], m[keep], dr[keep], di[keep], dcr[keep], dci[keep]
+            Zr, Zi, zr, zi, dzr, dzi = Zr[keep], Zi[keep], zr[keep], zi[keep], dzr[keep], dzi[keep]
+        tr, ti = 2*Zr + dr, 2*Zi + di
+        dr, di = tr*dr - ti*di + dcr, tr*di + ti*dr + dci
+        m = m + 1
+    if idx.size:
+        zr, zi = ref_r[np.minimum(m, last)] + dr, ref_i[np.minimum(m, last)] + di
+        flat["z"][idx] = zr + 1j * zi
+        flat["dz"][idx] = dzr + 1j * dzi
+    if stats is not None:
+        stats["reference_length"] = int(ref_r.size)
+        stats["rebases"] = rebases
+        stats["iterations"] = iterations
+    return field
+
+# --- MARIANI-SILVER SUBDIVISION ---
+# The Mandelbrot set is connected, so if the whole border of a rectangle has one escape
+# count, the inside has it too. Only rectangle borders are iterated: uniform rectangles
+# are flood-filled, the rest are split into quadrants down to MIN_RECT_SIZE and then
+# computed in full. Each subdivision level is iterated as one batched mandelbrot_field
+# call. Filled pixels copy the escape count and trap of their border and z/dz of the
+# rectangle's corner, so distance-estimation coloring is approximate inside filled areas.
+def _rect_border(y0, y1, x0, x1):
+    return (slice(y0, y0 + 1), slice(x0, x1)), (slice(y1 - 1, y1), slice(x0, x1)), \
+           (slice(y0, y1), slice(x0, x0 + 1)), (slice(y0, y1), slice(x1 - 1, x1))
+
+def mariani_silver_field(center, zoom, res, max_iter=MAX_ITER, min_size=MIN_RECT_SIZE, stats=None,
+                         compact=False, precision=np.float64, backend=None):
+    """FIELD_DTYPE array for a view computed by rectangle subdivision.
+
+    If a dict is passed as `stats`, "iterated_fraction" records the share of pixels that
+    were actually iterated (the rest were filled), alongside the kernel shortcut counts."""
+    c = complex_plane(center, zoom, res)
+    h, w = c.shape
+    field = np.zeros((h, w), dtype=COMPACT_FIELD_DTYPE if compact else FIELD_DTYPE)
+    done = np.zeros((h, w), dtype=bool)
+    kernel_stats = stats if stats is not None else {}
+
+    def iterate(mask):
+        todo = mask & ~done
+        if todo.any():
+            field[todo] = mandelbrot_field(c[todo], max_iter, stats=kernel_stats, backend=backend,
+                                           compact=compact, precision=precision)
+            done[todo] = True
+
+    iterated = 0
+    rects = [(0, h, 0, w)]
+    while rects:
+        border = np.zeros((h, w), dtype=bool)
+        for rect in rects:
+            for edge in _rect_border(*rect):
+                border[edge] = True
+        before = int(done.sum())
+        iterate(border)
+        iterated += int(done.sum()) - before
+        small = np.zeros((h, w), dtype=bool)
+        next_rects = []
+        for y0, y1, x0, x1 in rects:
+            if y1 - y0 <= min_size or x1 - x0 <= min_size:
+                small[y0:y1, x0:x1] = True
+                continue
+            edges = np.concatenate([field["iters"][edge].ravel() for edge in _rect_border(y0, y1, x0, x1)])
+            if (edges == edges[0]).all():
+                inner = (slice(y0 + 1, y1 - 1), slice(x0 + 1, x1 - 1))
+                fill = ~done[inner]
+                field["iters"][inner][fill] = edges[0]
+                field["trap"][inner][fill] = min(field["trap"][edge].min() for edge in _rect_border(y0, y1, x0, x1))
+                field["z"][inner][fill] = field["z"][y0, x0]
+                field["dz"][inner][fill] = field["dz"][y0, x0]
+                done[inner] = True
+                continue
+            ym, xm = (y0 + y1) // 2, (x0 + x1) // 2
+            next_rects += [(y0, ym + 1, x0, xm + 1), (y0, ym + 1, xm, x1),
+                           (ym, y1, x0, xm + 1), (ym, y1, xm, x1)]
+        before = int(done.sum())
+        iterate(small)
+        iterated += int(done.sum()) - before
+        rects = next_rects
+    if stats is not None:
+        stats["iterated_fraction"] = iterated / (h * w)
+    return field
+
+# --- CONTINUOUS ZOOM SEQUENCES ---
+# A smooth zoom is drawn from oversized keyframes: keyframe k covers the view at zoom
+# zoom_start * 2**k with 2*res pixels per side, and every frame until the next keyframe
+# is a nearest-neighbour crop of it. Zooming in 2x puts every other pixel of the next
+# keyframe exactly on a pixel of the current one (same c, bit for bit), so a quarter of
+# each keyframe is copied and only the other three quarters are iterated fresh.
+KEYFRAME_OVERSAMPLE = 2
+
+def zoom_in_keyframe(prev, center, zoom, max_iter=MAX_ITER, stats=None, precision=np.float64, backend=None):
+    """Keyframe at `zoom`, reusing `prev` (the keyframe at zoom / 2) where pixels coincide."""
+    h, w = prev.shape
+    c = complex_plane(center, zoom, (h, w))
+    rows, cols = np.arange(h) + h // 2, np.arange(w) + w // 2
+    shared_rows, shared_cols = rows % 2 == 0, cols % 2 == 0
+    reuse = shared_rows[:, np.newaxis] & shared_cols[np.newaxis, :]
+    field = np.empty((h, w), dtype=prev.dtype)
+    field[np.ix_(shared_rows, shared_cols)] = prev[np.ix_(rows[shared_rows] // 2, cols[shared_cols] // 2)]
+    field[~reuse] = mandelbrot_field(c[~reuse], max_iter, stats=stats, backend=backend,
+                                     compact=prev.dtype == COMPACT_FIELD_DTYPE, precision=precision)
+    if stats is not None:
+        stats["reused_pixels"] = stats.get("reused_pixels", 0) + int(reuse.sum())
+        stats["iterated_pixels"] = stats.get("iterated_pixels", 0) + int((~reuse).sum())
+    return field
+
+def crop_keyframe(keyframe, keyframe_zoom, zoom, res):
+    """Resamples the centered part of a keyframe that a plane_shape(res) view at `zoom` shows."""
+    idx = []
+    for size, n in zip(keyframe.shape, plane_shape(res)):
+        offsets = (np.arange(n) - n/2) * (size/n) * (keyframe_zoom / zoom)
+        idx.append(np.clip(np.rint(size/2 + offsets).astype(np.int64), 0, size - 1))
+    return keyframe[np.ix_(*idx)]
+
+# --- JULIA ENGINE ---
+# Julia sets use the same recurrence with the roles swapped: z_0 is the pixel and c is
+# fixed per frame. julia_field() broadcasts z0 against c, so a (frames, 1, 1) array of c
+# values against one (H, W) grid iterates a whole batch of frames in a single pass
+# (same active-set loop and Brent cycle check as mandelbrot_field). dz is the derivative
+# with respect to z0, so the distance-estimation coloring applies unchanged.
+def julia_field(z0, c, max_iter=MAX_ITER, stats=None):
+    """FIELD_DTYPE array of escape data for z_{n+1} = z_n^2 + c starting from z0."""
+    z0, c = np.broadcast_arrays(np.asarray(z0, dtype=np.complex128), np.asarray(c, dtype=np.complex128))
+    field = np.zeros(z0.shape, dtype=FIELD_DTYPE)
+    flat = field.reshape(-1)
+    flat["iters"] = max_iter
+    flat["trap"] = 1e9
+    trap = flat["trap"]
+    zr = z0.real.ravel().copy()
+    zi = z0.imag.ravel().copy()
+    cr = c.real.ravel().copy()
+    ci = c.imag.ravel().copy()
+    idx = np.arange(zr.size)
+    dzr = np.ones_like(zr)
+    dzi = np.zeros_like(zr)
+    saved_r, saved_i = zr.copy(), zi.copy()
+    peak_bytes = field.nbytes + sum(arr.nbytes for arr in (zr, zi, cr, ci, idx, dzr, dzi, saved_r, saved_i))
+    next_save = 1
+    periodic_count = 0
+    with np.errstate(over="ignore", invalid="ignore"):
+        for n in range(max_iter):
+            if idx.size == 0:
+                break
+            if n > 0:
+                dzr, dzi = 2*zr*dzr - 2*zi*dzi, 2*zr*dzi + 2*zi*dzr
+            trap[idx] = np.minimum(trap[idx], np.abs(zi))
+            escaped = np.hypot(zr, zi) > 2
+            if escaped.any():
+                done = idx[escaped]
+                flat["iters"][done] = n
+                flat["z"][done] = zr[escaped] + 1j * zi[escaped]
+                flat["dz"][done] = dzr[escaped] + 1j * dzi[escaped]
+                keep = ~escaped
+                idx, zr, zi, cr, ci = idx[keep], zr[keep], zi[keep], cr[keep], ci[keep]
+                dzr, dzi, saved_r, saved_i = dzr[keep], dzi[keep], saved_r[keep], saved_i[keep]
+            zr, zi = zr*zr - zi*zi + cr, zr*zi + zi*zr + ci
+            periodic = (zr == saved_r) & (zi == saved_i)
+            if periodic.any():
+                periodic_count += int(periodic.sum())
+                done = idx[periodic]
+                flat["z"][done] = zr[periodic] + 1j * zi[periodic]
+                flat["dz"][done] = dzr[periodic] + 1j * dzi[periodic]
+                keep = ~periodic
+                idx, zr, zi, cr, ci = idx[keep], zr[keep], zi[keep], cr[keep], ci[keep]
+                dzr, dzi, saved_r, saved_i = dzr[keep], dzi[keep], saved_r[keep], saved_i[keep]
+            if n + 1 == next_save:
+                saved_r, saved_i = zr.copy(), zi.copy()
+                next_save *= 2
+        if idx.size:
+            flat["z"][idx] = zr + 1j * zi
+            flat["dz"][idx] = dzr + 1j * dzi
+    if stats is not None:
+        merge_stats(stats, {"periodic": periodic_count, "peak_bytes": peak_bytes})
+    return field
+
+def julia_path(frames, radius=1.0):
+    """c values tracing the main cardioid boundary c = r e^{it}/2 - r^2 e^{2it}/4 once around."""
+    t = np.linspace(0, 2*np.pi, frames, endpoint=False)
+    w = radius * np.exp(1j * t)
+    return w / 2 - w * w / 4
+
+# --- ITERATION FIELD CACHE ---
+# The color tour re-renders each view once per color scheme, but the fractal math only
+# depends on the view. Fields are cached by (center, zoom, res, max_iter) in an in-memory
+# LRU tier backed by .npy files on disk, so a recolor or a re-run never iterates again.
+# The memory tier is capped in bytes, since a field's size follows the output resolution.
+# Approximate fields (tile-pyramid resamples, Mariani-Silver fills) carry their engine in
+# the key, so an exact render never gets one back.
+class FieldCache:
+    """Two-tier (memory LRU + on-disk .npy) cache of FIELD_DTYPE arrays."""
+    def __init__(self, max_bytes=FIELD_CACHE_MAX_BYTES, cache_dir=None):
+        """The most recent field is always kept in memory, even one larger than max_bytes."""
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self._memory = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(center, zoom, res, max_iter, compact=False, engine=None):
+        center = tuple(str(v) for v in center) if isinstance(center, tuple) else complex(center)
+        res = int(res) if np.isscalar(res) else plane_shape(res)
+        key = (center, float(zoom), res, int(max_iter))
+        if compact:
+            key += ("compact",)
+        return key + (engine,) if engine is not None else key
+
+    def _path(self, key):
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"field_{digest}.npy")
+
+    def get(self, key, stats=None):
+        """Returns the cached field for key, or None (counted as a miss). The lookup is
+        also counted into `stats` ("hits", "disk_hits" or "misses"), if given."""
+        with self._lock:
+            field, outcome = self._get(key)
+        if stats is not None:
+            stats[outcome] = stats.get(outcome, 0) + 1
+        return field
+
+    def _get(self, key):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key], "hits"
+        if self.cache_dir is not None and os.path.exists(self._path(key)):
+            field = np.load(self._path(key))
+            self._remember(key, field)
+            self.disk_hits += 1
+            return field, "disk_hits"
+        self.misses += 1
+        return None, "misses"
+
+    def put(self, key, field):
+        with self._lock:
+            self._remember(key, field)
+        if self.cache_dir is not None:
+            path = self._path(key)
+            tmp = path + ".tmp.npy"
+            np.save(tmp, field)
+            os.replace(tmp, path)
+
+    def _remember(self, key, field):
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        self._memory[key] = field
+        self._bytes += field.nbytes
+        while self._bytes > self.max_bytes and len(self._memory) > 1:
+            self._bytes -= self._memory.popitem(last=False)[1].nbytes
+
+    def stats(self):
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses}
+
+# --- TILE PYRAMID ---
+# A quadtree over the square [-2, 2] x [-2, 2] (tiles outside it are addressed the same
+# way): level L has 2**L tiles per side, each PYRAMID_TILE samples across. A view is served
+# from the level whose sample spacing is nearest its pixel spacing, taking the nearest
+# tile sample for every pixel, so only tiles never seen before are iterated. The result
+# is an approximation of the exact field, which pays off only for overlapping views.
+# Tiles live in one memory-mapped .npy with a JSON index, and the least recently used
+# slot is overwritten once the store is full.
+PYRAMID_ORIGIN = complex(-2, -2)
+PYRAMID_SPAN = 4.0
+
+class TilePyramid:
+    """Persistent, size-capped store of field tiles addressed by (level, tx, ty)."""
+    def __init__(self, path=PYRAMID_DIR, max_iter=MAX_ITER, tile=PYRAMID_TILE, max_bytes=PYRAMID_MAX_BYTES,
+                 compact=False):
+        self.path = path
+        self.max_iter = max_iter
+        self.tile = tile
+        self.compact = compact
+        self.dtype = COMPACT_FIELD_DTYPE if compact else FIELD_DTYPE
+        self.max_tiles = max(1, max_bytes // (tile * tile * self.dtype.itemsize))
+        self._lock = threading.Lock()
+        self._index = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(path, exist_ok=True)
+        meta = {"max_iter": max_iter, "tile": tile, "compact": compact, "max_tiles": self.max_tiles}
+        tiles_path = os.path.join(path, "tiles.npy")
+        index_path = os.path.join(path, "index.json")
+        if os.path.exists(tiles_path) and os.path.exists(index_path):
+            with open(index_path) as f:
+                saved = json.load(f)
+            if saved["meta"] == meta:
+                self._tiles = np.lib.format.open_memmap(tiles_path, mode="r+")
+                self._index.update((tuple(key), slot) for key, slot in saved["tiles"])
+        if not self._index:
+            self._tiles = np.lib.format.open_memmap(tiles_path, mode="w+", dtype=self.dtype,
+                                                    shape=(self.max_tiles, tile, tile))
+        self._meta = meta
+        self._free = sorted(set(range(self.max_tiles)) - set(self._index.values()), reverse=True)
+
+    def level_for(self, spacing):
+        """Level whose sample spacing is nearest to spacing (on a log scale)."""
+        return max(0, round(math.log2(PYRAMID_SPAN / (self.tile * spacing))))
+
+    def _tile_plane(self, level, tx, ty):
+        step = PYRAMID_SPAN / (2**level * self.tile)
+        k = np.arange(self.tile)
+        c = np.empty((self.tile, self.tile), dtype=np.complex128)
+        c.real = (PYRAMID_ORIGIN.real + (tx * self.tile + k) * step)[np.newaxis, :]
+        c.imag = (PYRAMID_ORIGIN.imag + (ty * self.tile + k) * step)[:, np.newaxis]
+        return c
+
+    def _get(self, key):
+        slot = self._index.get(key)
+        if slot is None:
+            self.misses += 1
+            return None
+        self._index.move_to_end(key)
+        self.hits += 1
+        return np.array(self._tiles[slot])
+
+    def _put(self, key, field):
+        if self._free:
+            slot = self._free.pop()
+        else:
+            _, slot = self._index.popitem(last=False)
+            self.evictions += 1
+        self._tiles[slot] = field
+        self._index[key] = slot
+
+    def flush(self):
+        """Writes tile data and the index to disk."""
+        with self._lock:
+            self._tiles.flush()
+            index_path = os.path.join(self.path, "index.json")
+            with open(index_path + ".tmp", "w") as f:
+                json.dump({"meta": self._meta, "tiles": [[list(key), slot] for key, slot in self._index.items()]}, f)
+            os.replace(index_path + ".tmp", index_path)
+
+    def viewport(self, center, zoom, res, backend=None, stats=None):
+        """The field of complex_plane(center, zoom, res), assembled from tiles.
+
+        Missing tiles are iterated together in one batch and stored. Tile counts go to
+        stats["tiles_reused"] and stats["tiles_computed"]."""
+        h, w = plane_shape(res)
+        spacing = (1.5 / zoom) / (h / 2)
+        level = self.level_for(spacing)
+        step = PYRAMID_SPAN / (2**level * self.tile)
+        gx = np.rint((center.real + (np.arange(w) - w/2) * spacing - PYRAMID_ORIGIN.real) / step).astype(np.int64)
+        gy = np.rint((center.imag + (np.arange(h) - h/2) * spacing - PYRAMID_ORIGIN.imag) / step).astype(np.int64)
+        tx0, tx1 = int(gx[0] // self.tile), int(gx[-1] // self.tile)
+        ty0, ty1 = int(gy[0] // self.tile), int(gy[-1] // self.tile)
+        keys = [(level, tx, ty) for ty in range(ty0, ty1 + 1) for tx in range(tx0, tx1 + 1)]
+        with self._lock:
+            tiles = {key: self._get(key) for key in keys}
+        missing = [key for key, field in tiles.items() if field is None]
+        if missing:
+            c = np.stack([self._tile_plane(*key) for key in missing])
+            precision = np.float32 if self.compact and step >= SINGLE_PRECISION_MIN_SPACING else np.float64
+            fields = mandelbrot_field(c, self.max_iter, stats=stats, backend=backend, compact=self.compact,
+                                      precision=precision)
+            with self._lock:
+                for key, field in zip(missing, fields):
+                    tiles[key] = field
+                    self._put(key, field)
+            self.flush()
+        if stats is not None:
+            merge_stats(stats, {"tiles_reused": len(keys) - len(missing), "tiles_computed": len(missing)})
+        mosaic = np.empty(((ty1 - ty0 + 1) * self.tile, (tx1 - tx0 + 1) * self.tile), dtype=self.dtype)
+        for (_, tx, ty), field in tiles.items():
+            y, x = (ty - ty0) * self.tile, (tx - tx0) * self.tile
+            mosaic[y:y + self.tile, x:x + self.tile] = field
+        return mosaic[np.ix_(gy - ty0 * self.tile, gx - tx0 * self.tile)]
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "tiles": len(self._index)}
+
+# --- FRACTAL RENDERER ---
+class MandelbrotRenderer:
+    """
+    Handles the rendering of the Mandelbrot set with various color schemes and zoom levels.
+    """
+    def __init__(self, res=RESOLUTION, max_iter=MAX_ITER, workers=1, tile=TILE_SIZE, cache=None,
+                 deep_ulps=DEEP_ZOOM_ULPS, strategy="full", backend=None, compact=False, antialias=0,
+                 pyramid=None, progressive=0):
+        """workers > 1 renders tiles in a tile_pool() (workers=None uses every core); scripts
+        that use it need the usual `if __name__ == "__main__":` guard.
+        cache is an optional FieldCache shared across renders. Views whose pixels are fewer
+        than deep_ulps float64 steps apart, or with a (re, im) decimal-string center, use
+        the perturbation engine (see needs_perturbation).
+        strategy="mariani-silver" iterates only rectangle borders and fills uniform ones.
+        backend forces the "jit" or "numpy" kernel (default: JIT when numba is available).
+        compact=True stores uint16/float32 fields and iterates shallow views in float32.
+        Each computed frame reports its kernel working set as kernel_stats["peak_bytes"].
+        antialias=N re-samples edge pixels on an NxN jittered grid (not for deep views);
+        the number of refined pixels is reported as kernel_stats["refined_pixels"].
+        Hooks registered with add_hook() receive a stats record for every render() call.
+        pyramid is an optional TilePyramid that non-deep views are assembled from.
+        progressive=N keeps the fields of the last N exactly computed, non-compact views,
+        so after raising self.max_iter those views only iterate their unescaped pixels
+        further (kernel_stats["resumed_pixels"]); refine() does this without the store."""
+        if compact and max_iter > np.iinfo(np.uint16).max:
+            raise ValueError(f"compact mode needs max_iter <= 65535, got {max_iter}")
+        if pyramid is not None and (pyramid.max_iter, pyramid.compact) != (max_iter, compact):
+            raise ValueError("the tile pyramid must use the renderer's max_iter and compact setting")
+        self.res = res
+        self.max_iter = max_iter
+        self.workers = workers if workers is not None else os.cpu_count()
+        self.tile = tile
+        self.cache = cache
+        self.deep_ulps = deep_ulps
+        self.strategy = strategy
+        self.backend = backend
+        self.compact = compact
+        self.antialias = antialias
+        self.pyramid = pyramid
+        self.progressive = progressive
+        self._local = threading.local()
+        self.hooks = []
+        self._progress = OrderedDict()
+        self._lock = threading.Lock()  # RenderQueue computes fields from several threads
+        self._pool = None
+
+    @property
+    def kernel_stats(self):
+        """Kernel counters of the last field computed on the calling thread."""
+        stats = getattr(self._local, "stats", None)
+        if stats is None:
+            stats = self._local.stats = {}
+        return stats
+
+    @kernel_stats.setter
+    def kernel_stats(self, stats):
+        self._local.stats = stats
+
+    @property
+    def cache_stats(self):
+        """FieldCache lookups of the last compute_field() on the calling thread (None
+        without a cache)."""
+        return getattr(self._local, "cache_stats", None)
+
+    @cache_stats.setter
+    def cache_stats(self, stats):
+        self._local.cache_stats = stats
+
+    def compute_field(self, center, zoom, resume=None):
+        """Returns the FIELD_DTYPE array for a view, from the cache when possible.
+
+        resume=(field, n) is an exactly computed field of this view at max_iter=n to
+        continue from; it is ignored when the view is not computed exactly."""
+        if self.cache is None:
+            self.cache_stats = None
+            return self._iterate(center, zoom, resume)
+        engine = self._engine(center, zoom)
+        key = FieldCache.key(center, zoom, self.res, self.max_iter, self.compact,
+                             engine if engine in ("pyramid", "mariani-silver") else None)
+        self.cache_stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+        field = self.cache.get(key, stats=self.cache_stats)
+        if field is None:
+            field = self._iterate(center, zoom, resume)
+            self.cache.put(key, field)
+        else:
+            self.kernel_stats = {}
+        return field
+
+    def _engine(self, center, zoom):
+        """"perturbation", "pyramid", "mariani-silver" or "exact": what computes a view."""
+        if needs_perturbation(center, zoom, self.res, self.deep_ulps):
+            return "perturbation"
+        if self.pyramid is not None and self.pyramid.max_iter == self.max_iter:
+            return "pyramid"
+        if self.strategy == "mariani-silver":
+            return "mariani-silver"
+        return "exact"
+
+    def _resumable(self, center, zoom):
+        """Only full-precision exact fields hold the state needed to continue iterating."""
+        return self._engine(center, zoom) == "exact" and not self.compact
+
+    def _precision(self, zoom, res):
+        return choose_precision(zoom, res) if self.compact else np.float64
+
+    def _iterate(self, center, zoom, resume=None):
+        self.kernel_stats = {}
+        engine = self._engine(center, zoom)
+        if engine == "perturbation":
+            return perturbation_field(center, zoom, self.res, self.max_iter, stats=self.kernel_stats,
+                                      compact=self.compact)
+        if not self._resumable(center, zoom):
+            return self._compute(engine, center, zoom)
+        view = FieldCache.key(center, zoom, self.res, 0, self.compact)
+        if resume is None and self.progressive:
+            with self._lock:
+                resume = self._progress.get(view)
+        if resume is not None and resume[1] < self.max_iter:
+            prev, prev_iter = resume
+            field = mandelbrot_field(complex_plane(center, zoom, self.res), self.max_iter, stats=self.kernel_stats,
+                                     backend=self.backend, compact=self.compact,
+                                     precision=self._precision(zoom, self.res), resume=(prev, prev_iter))
+            self.kernel_stats["resumed_pixels"] = int(np.count_nonzero(prev["iters"] == prev_iter))
+        else:
+            field = self._compute(engine, center, zoom)
+        if self.progressive:
+            with self._lock:
+                stored = self._progress.get(view)
+                if stored is None or stored[1] < self.max_iter:
+                    self._progress[view] = (field, self.max_iter)
+                self._progress.move_to_end(view)
+                while len(self._progress) > self.progressive:
+                    self._progress.popitem(last=False)
+        return field
+
+    def _compute(self, engine, center, zoom):
+        precision = self._precision(zoom, self.res)
+        if engine == "pyramid":
+            return self.pyramid.viewport(center, zoom, self.res, backend=self.backend, stats=self.kernel_stats)
+        if engine == "mariani-silver":
+            return mariani_silver_field(center, zoom, self.res, self.max_iter, stats=self.kernel_stats,
+                                        compact=self.compact, precision=precision, backend=self.backend)
+        if self.workers > 1:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = tile_pool(self.workers)
+            return parallel_mandelbrot_field(self._pool, center, zoom, self.res, self.max_iter, self.tile,
+                                             stats=self.kernel_stats, compact=self.compact, precision=precision,
+                                             backend=self.backend)
+        return mandelbrot_field(complex_plane(center, zoom, self.res), self.max_iter, stats=self.kernel_stats,
+                                backend=self.backend, compact=self.compact, precision=precision)
+
+    def close(self):
+        """Shuts down the worker pool, if one was started."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+    def refine(self, center, zoom, iter_steps, color_func=get_smooth_color):
+        """Coarse-to-fine preview: yields (max_iter, rgb) for each increasing max_iter in
+        iter_steps, each pass continuing the previous one when the view is computed exactly.
+        Leaves self.max_iter at the last."""
+        resume = None
+        for max_iter in iter_steps:
+            if self.compact and max_iter > np.iinfo(np.uint16).max:
+                raise ValueError(f"compact mode needs max_iter <= 65535, got {max_iter}")
+            self.max_iter = max_iter
+            field = self.compute_field(center, zoom, resume)
+            resume = (field, max_iter) if self._resumable(center, zoom) else None
+            yield max_iter, self.colorize(field, center, zoom, color_func)
+
+    def make_image(self, rgb):
+        """What render() returns for a frame: the RGB array here; scene renderers wrap it."""
+        return rgb
+
+    def add_hook(self, hook):
+        """Registers hook(record) to be called with a stats dict after every render() and
+        every frame a RenderQueue renders, on the thread that rendered it.
+
+        The record holds wall times per phase ("iterate", "histogram", "colorize", and
+        "image" for render()), the pixel iterations the kernels ran ("iterations", 0 on a
+        cache hit or a field shared with an earlier queued frame), the interior pixel
+        fraction, the escape-count histogram, this call's cache lookups and a copy of
+        kernel_stats."""
+        self.hooks.append(hook)
+        return hook
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def render(self, center, zoom, color_func=get_smooth_color, **kwargs):
+        if not self.hooks:
+            return self.make_image(self.render_rgb(center, zoom, color_func))
+        return self._instrumented_render(center, zoom, color_func)
+
+    def _instrumented_render(self, center, zoom, color_func):
+        t0 = time.perf_counter()
+        field = self.compute_field(center, zoom)
+        rgb, record = self._colorize_recorded(field, center, zoom, color_func, time.perf_counter() - t0)
+        t1 = time.perf_counter()
+        image = self.make_image(rgb)
+        record["phases"]["image"] = time.perf_counter() - t1
+        self._emit(record)
+        return image
+
+    def _colorize_recorded(self, field, center, zoom, color_func, iterate_s):
+        """colorize() for a field this thread just got from compute_field() in iterate_s
+        seconds; also returns the stats record for hooks."""
+        t0 = time.perf_counter()
+        histogram = escape_histogram(field, self.max_iter)
+        t1 = time.perf_counter()
+        rgb = self.colorize(field, center, zoom, color_func, histogram=histogram)
+        t2 = time.perf_counter()
+        record = {
+            "center": center, "zoom": zoom, "color": color_func.__name__, "res": self.res,
+            "max_iter": self.max_iter,
+            "phases": {"iterate": iterate_s, "histogram": t1 - t0, "colorize": t2 - t1},
+            "iterations": self.kernel_stats.get("iterations", 0),
+            "interior_fraction": float(np.mean(field["iters"] == self.max_iter)),
+            "escape_histogram": histogram,
+            "cache": dict(self.cache_stats) if self.cache_stats is not None else None,
+            "kernel": dict(self.kernel_stats),
+        }
+        return rgb, record
+
+    def _emit(self, record):
+        for hook in self.hooks:
+            hook(record)
+
+    def render_rgb(self, center, zoom, color_func=get_smooth_color):
+        """Same image as render(), as a uint8 RGB array (safe to call off the main thread)."""
+        return self.colorize(self.compute_field(center, zoom), center, zoom, color_func)
+
+    def colorize(self, field, center, zoom, color_func=get_smooth_color, histogram=None):
+        """Colors a field of this view, antialiasing edge pixels if enabled."""
+        rgb = colorize_field(field, color_func, self.max_iter, histogram=histogram)
+        if self.antialias > 1 and not needs_perturbation(center, zoom, self.res, self.deep_ulps):
+            rgb = antialias_rgb(rgb, field, center, zoom, self.max_iter, color_func, self.antialias,
+                                stats=self.kernel_stats, histogram=histogram, backend=self.backend)
+        return rgb
+
+    def zoom_sequence(self, center, zoom_start, zoom_end, frames, color_func=get_smooth_color):
+        """Yields `frames` RGB arrays zooming exponentially from zoom_start to zoom_end.
+
+        Frames are produced lazily and only the current keyframe is kept, so memory use
+        does not grow with the length of the sequence. Reuse counts go to kernel_stats.
+        Keyframes are only built zooming in, so zoom_end must be >= zoom_start."""
+        if zoom_end < zoom_start:
+            raise ValueError(f"zoom_sequence only zooms in, got zoom_start={zoom_start} > zoom_end={zoom_end}")
+        self.kernel_stats = {}
+        size = tuple(KEYFRAME_OVERSAMPLE * n for n in plane_shape(self.res))
+        keyframe, level = None, -1
+        for zoom in np.geomspace(zoom_start, zoom_end, frames):
+            target = max(int(np.floor(np.log2(zoom / zoom_start) + 1e-9)), 0)
+            while level < target:
+                level += 1
+                key_zoom = zoom_start * 2.0**level
+                if keyframe is None or needs_perturbation(center, key_zoom, size, self.deep_ulps):
+                    keyframe = self._keyframe(center, key_zoom, size)
+                else:
+                    keyframe = zoom_in_keyframe(keyframe, center, key_zoom, self.max_iter, stats=self.kernel_stats,
+                                                precision=self._precision(key_zoom, size), backend=self.backend)
+            field = crop_keyframe(keyframe, zoom_start * 2.0**level, zoom, self.res)
+            yield colorize_field(field, color_func, self.max_iter)
+
+    def _keyframe(self, center, zoom, size):
+        if needs_perturbation(center, zoom, size, self.deep_ulps):
+            return perturbation_field(center, zoom, size, self.max_iter, stats=self.kernel_stats,
+                                      compact=self.compact)
+        return mandelbrot_field(complex_plane(center, zoom, size), self.max_iter, stats=self.kernel_stats,
+                                backend=self.backend, compact=self.compact, precision=self._precision(zoom, size))
+
+class JuliaRenderer:
+    """
+    Renders Julia sets for a whole path of c parameters, JULIA_BATCH frames per batched pass.
+    Uses the same colorizers as MandelbrotRenderer and, optionally, the same FieldCache.
+    """
+    def __init__(self, res=RESOLUTION, max_iter=MAX_ITER, zoom=1.0, center=0j, batch=JULIA_BATCH, cache=None):
+        self.res = res
+        self.max_iter = max_iter
+        self.zoom = zoom
+        self.center = center
+        self.batch = batch
+        self.cache = cache
+        self.kernel_stats = {}
+
+    def make_image(self, rgb):
+        return rgb
+
+    def _key(self, c):
+        return ("julia", complex(c)) + FieldCache.key(self.center, self.zoom, self.res, self.max_iter)
+
+    def compute_fields(self, cs):
+        """(len(cs), height, width) FIELD_DTYPE array; cache misses are iterated batch by batch."""
+        cs = np.asarray(cs, dtype=np.complex128).ravel()
+        fields = np.empty((cs.size,) + plane_shape(self.res), dtype=FIELD_DTYPE)
+        missing = []
+        for i, c in enumerate(cs):
+            cached = self.cache.get(self._key(c)) if self.cache is not None else None
+            if cached is None:
+                missing.append(i)
+            else:
+                fields[i] = cached
+        self.kernel_stats = {}
+        z0 = complex_plane(self.center, self.zoom, self.res)
+        for start in range(0, len(missing), self.batch):
+            chunk = missing[start:start + self.batch]
+            batch_fields = julia_field(z0, cs[chunk][:, np.newaxis, np.newaxis], self.max_iter, stats=self.kernel_stats)
+            fields[chunk] = batch_fields
+            if self.cache is not None:
+                for i, field in zip(chunk, batch_fields):
+                    self.cache.put(self._key(cs[i]), field)
+        return fields
+
+    def render_rgb_frames(self, cs, color_func=get_smooth_color):
+        """One uint8 RGB array per c, computed a batch at a time."""
+        cs = np.asarray(cs, dtype=np.complex128).ravel()
+        for start in range(0, cs.size, self.batch):
+            for field in self.compute_fields(cs[start:start + self.batch]):
+                yield colorize_field(field, color_func, self.max_iter)
+
+    def render(self, c, color_func=get_smooth_color):
+        return self.make_image(next(self.render_rgb_frames([c], color_func)))
+
+    def render_path(self, frames=JULIA_STEPS, color_func=get_smooth_color, radius=1.0):
+        """Images for the Julia dance: one frame per c along julia_path()."""
+        return [self.make_image(rgb) for rgb in self.render_rgb_frames(julia_path(frames, radius), color_func)]
+
+# --- BUDDHABROT ORBIT DENSITY ---
+# A Buddhabrot counts how often escaping orbits pass through each pixel. Random c values
+# are drawn a fixed-size batch at a time; mandelbrot_field() finds which of them escape,
+# and only those orbits are replayed and accumulated into the density buffer. Each
+# worker process fills its own buffer and returns it once per job, and the results are
+# summed. Memory therefore depends on the image size and batch size, never on the sample
+# count. Batch i always uses the random stream seeded by (seed, i), so a render stopped at
+# a checkpoint and resumed produces the same image as an uninterrupted one.
+def buddhabrot_batch(density, rng, batch, center, zoom, max_iter=MAX_ITER, min_iter=0):
+    """Adds the orbits of `batch` random escaping c samples to density (shape (H, W)).
+
+    Returns the number of orbits accumulated."""
+    h, w = density.shape
+    spacing = (1.5 / zoom) / (h / 2)
+    c = np.empty(batch, dtype=np.complex128)
+    c.real = rng.uniform(-2, 2, batch)
+    c.imag = rng.uniform(-2, 2, batch)
+    n = mandelbrot_field(c, max_iter)["iters"]
+    escaping = (n >= min_iter) & (n < max_iter)
+    c, n = c[escaping], n[escaping]
+    flat = density.reshape(-1)
+    z = np.zeros_like(c)
+    for k in range(1, int(n.max()) + 1 if n.size else 0):
+        z = z * z + c
+        x = np.rint((z.real - center.real) / spacing + w / 2).astype(np.int64)
+        y = np.rint((z.imag - center.imag) / spacing + h / 2).astype(np.int64)
+        inside = (x >= 0) & (x < w) & (y >= 0) & (y < h)
+        np.add.at(flat, y[inside] * w + x[inside], 1)
+        alive = n > k
+        if not alive.all():
+            z, c, n = z[alive], c[alive], n[alive]
+    return int(escaping.sum())
+
+def _buddhabrot_job(job):
+    shape, seed, first, count, batch, center, zoom, max_iter, min_iter = job
+    density = np.zeros(shape, dtype=np.uint64)
+    orbits = 0
+    for i in range(first, first + count):
+        orbits += buddhabrot_batch(density, np.random.default_rng([seed, i]), batch, center, zoom, max_iter, min_iter)
+    return density, orbits
+
+class BuddhabrotRenderer:
+    """
+    Streams random samples into an orbit-density image, with checkpoint/resume.
+    """
+    def __init__(self, res=RESOLUTION, max_iter=MAX_ITER, min_iter=0, center=complex(-0.5, 0), zoom=1.0,
+                 batch=BUDDHA_BATCH, workers=1, seed=0, checkpoint=None):
+        """checkpoint is an optional .npz path: an existing one with the same settings is
+        resumed, and run() rewrites it after every round of jobs."""
+        self.res = res
+        self.max_iter = max_iter
+        self.min_iter = min_iter
+        self.center = complex(center)
+        self.zoom = zoom
+        self.batch = batch
+        self.workers = workers if workers is not None else os.cpu_count()
+        self.seed = seed
+        self.checkpoint = checkpoint
+        self.density = np.zeros(plane_shape(res), dtype=np.uint64)
+        self.batches_done = 0
+        self.orbits = 0
+        if checkpoint is not None and os.path.exists(checkpoint):
+            self._resume()
+
+    def _settings(self):
+        return np.array([*plane_shape(self.res), self.max_iter, self.min_iter, self.center.real, self.center.imag,
+                         self.zoom, self.batch, self.seed], dtype=np.float64)
+
+    def _resume(self):
+        with np.load(self.checkpoint) as saved:
+            if not np.array_equal(saved["settings"], self._settings()):
+                raise ValueError(f"checkpoint {self.checkpoint} was written with different settings")
+            self.density = saved["density"]
+            self.batches_done = int(saved["batches_done"])
+            self.orbits = int(saved["orbits"])
+
+    def save(self):
+        """Writes density and progress to the checkpoint file (atomically)."""
+        tmp = self.checkpoint + ".tmp.npz"
+        np.savez(tmp, settings=self._settings(), density=self.density, batches_done=self.batches_done,
+                 orbits=self.orbits)
+        os.replace(tmp, self.checkpoint)
+
+    def run(self, samples, progress=None):
+        """Accumulates batches until `samples` c values have been drawn in total.
+
+        progress(batches_done, total_batches) is called after every round."""
+        total = -(-samples // self.batch)
+        shape = self.density.shape
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_pool_worker) if self.workers > 1 else None
+        try:
+            while self.batches_done < total:
+                jobs = []
+                first = self.batches_done
+                for _ in range(self.workers):
+                    count = min(BUDDHA_JOB_BATCHES, total - first)
+                    if count <= 0:
+                        break
+                    jobs.append((shape, self.seed, first, count, self.batch, self.center, self.zoom,
+                                 self.max_iter, self.min_iter))
+                    first += count
+                results = pool.map(_buddhabrot_job, jobs) if pool is not None else map(_buddhabrot_job, jobs)
+                for density, orbits in results:
+                    self.density += density
+                    self.orbits += orbits
+                self.batches_done = first
+                if self.checkpoint is not None:
+                    self.save()
+                if progress is not None:
+                    progress(self.batches_done, total)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return self.density
+
+    def render_rgb(self, color=WHITE):
+        """Log-scaled density as uint8 RGB, brightest pixel at `color`."""
+        peak = self.density.max()
+        t = np.log1p(self.density) / np.log1p(peak) if peak else np.zeros(self.density.shape)
+        return np.rint(t[..., np.newaxis] * np.asarray(color) * 255).astype(np.uint8)
+
+# --- BACKGROUND RENDER QUEUE ---
+# render() blocks the Manim timeline, while overlay construction and self.play/self.wait
+# leave the CPU mostly idle. RenderQueue takes the whole (center, zoom, color_func)
+# schedule up front and renders RGB frames ahead of the scene on background threads
+# (the kernels release the GIL). Iterating over the queue yields one Future per entry,
+# in order; advancing the iterator marks earlier frames as shown, which frees their
+# slot for the next prefetch, and the queue drops its reference to every yielded frame.
+# Entries that share a view share one field computation.
+class RenderQueue:
+    def __init__(self, renderer, schedule, workers=PREFETCH_WORKERS, depth=PREFETCH_DEPTH,
+                 max_bytes=PREFETCH_MAX_BYTES):
+        self.renderer = renderer
+        self.schedule = list(schedule)
+        frame_bytes = int(np.prod(plane_shape(renderer.res))) * 3
+        self.depth = max(1, min(depth, max_bytes // frame_bytes))
+        self.futures = [Future() for _ in self.schedule]
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._lock = threading.Lock()
+        self._next = 0
+        self._shown = 0
+        self._fields = {}
+        self._uses = {}
+        for center, zoom, _ in self.schedule:
+            key = FieldCache.key(center, zoom, renderer.res, renderer.max_iter)
+            self._uses[key] = self._uses.get(key, 0) + 1
+        self._pump()
+
+    def __iter__(self):
+        for i in range(len(self.futures)):
+            with self._lock:
+                self._shown = i
+            self._pump()
+            with self._lock:
+                future, self.futures[i] = self.futures[i], None
+            yield future
+        with self._lock:
+            self._shown = len(self.futures)
+
+    def _pump(self):
+        with self._lock:
+            while self._next < len(self.schedule) and self._next - self._shown < self.depth:
+                i = self._next
+                self._next += 1
+                self.futures[i].set_running_or_notify_cancel()
+                self._executor.submit(self._run, i, self.futures[i])
+
+    def _field(self, center, zoom):
+        key = FieldCache.key(center, zoom, self.renderer.res, self.renderer.max_iter)
+        with self._lock:
+            pending = self._fields.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._fields[key] = Future()
+        if owner:
+            try:
+                pending.set_result(self.renderer.compute_field(center, zoom))
+            except Exception as exc:
+                pending.set_exception(exc)
+        else:
+            # The owning thread's record counts the work and cache lookup for this field.
+            self.renderer.kernel_stats = {}
+            if self.renderer.cache is not None:
+                self.renderer.cache_stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+        field = pending.result()
+        with self._lock:
+            self._uses[key] -= 1
+            if self._uses[key] == 0:
+                del self._fields[key]
+        return field
+
+    def _run(self, i, future):
+        center, zoom, color_func = self.schedule[i]
+        renderer = self.renderer
+        try:
+            t0 = time.perf_counter()
+            field = self._field(center, zoom)
+            if renderer.hooks:
+                rgb, record = renderer._colorize_recorded(field, center, zoom, color_func, time.perf_counter() - t0)
+                renderer._emit(record)
+            else:
+                rgb = renderer.colorize(field, center, zoom, color_func)
+            future.set_result(rgb)
+        except Exception as exc:
+            future.set_exception(exc)
+        self._pump()
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,104 @@
+# --- JIT Kernel ---
+# fractal_core.mandelbrot_field() as a numba kernel: compiled on first use (the result is
+# cached on disk next to this file, or in NUMBA_CACHE_DIR), each pixel stops as soon as it
+# escapes, and blocks of pixels run in parallel. The kernels work on flattened arrays:
+# pixel i belongs to block i // block, and counts has one row per block. Imported lazily
+# by fractal_core.
+#
+# With start > 0 the output arrays already hold a field computed to max_iter=start:
+# pixels still running at start continue from their stored z, dz and trap, and all
+# others are left as they are.
+
+import math
+
+import numba
+
+# RenderQueue calls the kernel from background threads, which can hang interpreter exit
+# under TBB, and process pools may fork workers, which GNU OpenMP does not survive. So the
+# workqueue layer is used unless one was chosen explicitly. It must not be entered from
+# two threads at once; the kernel already uses every core, so callers take turns.
+if numba.config.THREADING_LAYER == "default":
+    numba.config.THREADING_LAYER = "workqueue"
+
+@numba.njit(cache=True, nogil=True)
+def _field_block(k, block, cr, ci, max_iter, shortcuts, start, iters, trap, z, dz, counts):
+    for x in range(k * block, min((k + 1) * block, cr.size)):
+        a = cr[x]
+        b = ci[x]
+        if start > 0:
+            if iters[x] != start:
+                continue
+            zr = z[x].real
+            zi = z[x].imag
+            dzr = dz[x].real
+            dzi = dz[x].imag
+            t = trap[x]
+        else:
+            trap[x] = 1e9
+            z[x] = 0j
+            dz[x] = 0j
+            zr = 0.0
+            zi = 0.0
+            dzr = 0.0
+            dzi = 0.0
+            t = 1e9
+        iters[x] = max_iter
+        if shortcuts and max_iter > 0:
+            xr = a - 0.25
+            q = xr*xr + b*b
+            if q * (q + xr) <= 0.25 * b*b:
+                counts[k, 0] += 1
+                trap[x] = 0.0
+                continue
+            if (a + 1)*(a + 1) + b*b <= 0.0625:
+                counts[k, 1] += 1
+                trap[x] = 0.0
+                continue
+        saved_r = zr
+        saved_i = zi
+        next_save = 2 * start if start > 0 else 1
+        finished = False
+        steps = 0
+        for n in range(start, max_iter):
+            steps += 1
+            if n > 0:
+                dzr, dzi = 2*zr*dzr - 2*zi*dzi + 1, 2*zr*dzi + 2*zi*dzr
+            else:
+                dzr = 1.0
+                dzi = 0.0
+            t = min(t, abs(zi))
+            if math.hypot(zr, zi) > 2:
+                iters[x] = n
+                z[x] = complex(zr, zi)
+                dz[x] = complex(dzr, dzi)
+                finished = True
+                break
+            zr, zi = zr*zr - zi*zi + a, zr*zi + zi*zr + b
+            if shortcuts:
+                if zr == saved_r and zi == saved_i:
+                    counts[k, 2] += 1
+                    z[x] = complex(zr, zi)
+                    dz[x] = complex(dzr, dzi)
+                    finished = True
+                    break
+                if n + 1 == next_save:
+                    saved_r = zr
+                    saved_i = zi
+                    next_save *= 2
+        counts[k, 3] += steps
+        trap[x] = t
+        if not finished:
+            z[x] = complex(zr, zi)
+            dz[x] = complex(dzr, dzi)
+
+@numba.njit(parallel=True, cache=True, nogil=True)
+def _jit_field_blocks(cr, ci, max_iter, shortcuts, start, block, iters, trap, z, dz, counts):
+    for k in numba.prange(counts.shape[0]):
+        _field_block(k, block, cr, ci, max_iter, shortcuts, start, iters, trap, z, dz, counts)
+
+# Tile-pool workers already run one process per core, so they use this single-threaded
+# version and never start a numba thread pool of their own.
+@numba.njit(cache=True, nogil=True)
+def _jit_field_blocks_serial(cr, ci, max_iter, shortcuts, start, block, iters, trap, z, dz, counts):
+    for k in range(counts.shape[0]):
+        _field_block(k, block, cr, ci, max_iter, shortcuts, start, iters, trap, z, dz, counts)
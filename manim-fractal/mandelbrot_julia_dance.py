@@ -9,95 +9,40 @@ from manim import (
 )
 import numpy as np
 
-# --- CONFIGURABLE PARAMETERS ---
-MAX_ITER = 200
-ZOOM_STEPS = 12
-RESOLUTION = 400
-
-# --- FAMOUS MANDELBROT LOCATIONS (center, zoom, label, color, highlight) ---
-FAMOUS_LOCATIONS = [
-    (complex(-0.75, 0), 1.0, "The Main Cardioid", GREEN, None),
-    (complex(-1.25, 0.0), 10, "Elephant Valley", ORANGE, None),
-    (complex(-0.7453, 0.1127), 100, "Seahorse Valley", BLUE, (0.355, 0.355)),
-    (complex(-0.1011, 0.9563), 200, "Spiral Valley", TEAL, (0.0, 0.95)),
-    (complex(-1.749, 0), 500, "The Needle", RED, (-1.749, 0)),
-    (complex(-0.7435, 0.1314), 2000, "Mini Mandelbrot", PINK, (-0.7435, 0.1314)),
-    (complex(0.282, 0.01), 10000, "Satellite", YELLOW, (0.282, 0.01)),
-]
-
-# --- COLOR ALGORITHMS ---
-def get_smooth_color(val, max_iter):
-    if val == max_iter:
-        return (0.0, 0.0, 0.0)
-    return manim.color_to_rgb(manim.interpolate_color(BLUE, WHITE, (val % max_iter) / max_iter))
-
-def get_histogram_color(val, max_iter, histogram, total):
-    if val == max_iter:
-        return (0.0, 0.0, 0.0)
-    hue = sum(histogram[:val]) / total
-    return manim.color_to_rgb(manim.interpolate_color(PINK, YELLOW, hue))
-
-def get_escape_time_color(val, max_iter):
-    if val == max_iter:
-        return (0.0, 0.0, 0.0)
-    palette = [BLUE, TEAL, GREEN, YELLOW, ORANGE, RED, PINK, WHITE]
-    idx = int(val) % len(palette)
-    return manim.color_to_rgb(palette[idx])
-
-def get_palette_cycle_color(val, max_iter):
-    if val == max_iter:
-        return (0.0, 0.0, 0.0)
-    palette = [BLUE, TEAL, GREEN, YELLOW, ORANGE, RED, PINK, WHITE]
-    t = (val % max_iter) / max_iter
-    idx = int(t * (len(palette) - 1))
-    frac = (t * (len(palette) - 1)) % 1
-    color = manim.interpolate_color(palette[idx], palette[min(idx+1, len(palette)-1)], frac)
-    return manim.color_to_rgb(color)
-
-def get_orbit_trap_color(val, max_iter, z_trap):
-    if val == max_iter:
-        return (0.0, 0.0, 0.0)
-    t = np.clip(z_trap, 0, 1)
-    return manim.color_to_rgb(manim.interpolate_color(BLUE, YELLOW, t))
-
-def get_distance_estimation_color(val, max_iter, z, dz):
-    if val == max_iter:
-        return (0.0, 0.0, 0.0)
-    d = abs(z) * np.log(abs(z)) / abs(dz) if abs(dz) > 0 else 0
-    t = np.clip(np.log1p(d), 0, 1)
-    return manim.color_to_rgb(manim.interpolate_color(RED, WHITE, t))
-
-# --- MANDELBROT CALCULATION (EXTENDED) ---
-def mandelbrot(c, max_iter=MAX_ITER):
-    """Calculate the escape time for a given complex number c in the Mandelbrot set."""
-    z = 0
-    for n in range(max_iter):
-        if abs(z) > 2:
-            return n
-        z = z * z + c
-    return max_iter
-
-def mandelbrot_orbit_trap(c, max_iter=MAX_ITER):
-    """Calculate the escape time and minimum distance to the real axis for a given complex number c."""
-    z = 0
-    min_dist = 1e9
-    for n in range(max_iter):
-        min_dist = min(min_dist, abs(z.imag))
-        if abs(z) > 2:
-            return n, min_dist
-        z = z * z + c
-    return max_iter, min_dist
-
-def mandelbrot_distance_estimation(c, max_iter=MAX_ITER):
-    """Calculate the escape time, z value, and its derivative for a given complex number c."""
-    z = 0
-    dz = 0
-    for n in range(max_iter):
-        dz = 2 * z * dz + 1 if n > 0 else 1
-        if abs(z) > 2:
-            return n, z, dz
-        z = z * z + c
-    return max_iter, z, dz
+from fractal_core import (
+    MAX_ITER, RESOLUTION, FIELD_CACHE_DIR, PYRAMID_DIR, TOUR_PYRAMID, FAMOUS_LOCATIONS,
+    get_smooth_color, get_histogram_color, get_escape_time_color, get_palette_cycle_color,
+    get_orbit_trap_color, get_distance_estimation_color, FieldCache, TilePyramid, RenderQueue,
+)
+import fractal_core
+
+# --- OVERLAY CACHE ---
+# Text and MathTex overlays go through Pango/LaTeX layout on every construction, and the
+# tour rebuilds the same labels once per color scheme. OverlayCache builds each distinct
+# (factory, args) overlay once and hands out copies, which only duplicate the point data.
+class OverlayCache:
+    """Memoizes overlay factories: cache(make_coord_overlay, center) returns a fresh copy."""
+    def __init__(self):
+        self._built = {}
+        self.builds = 0
+        self.hits = 0
+        self.layouts_avoided = 0
+
+    def __call__(self, factory, *args):
+        key = (factory.__name__, tuple(repr(a) for a in args))
+        entry = self._built.get(key)
+        if entry is None:
+            mob = factory(*args)
+            layouts = sum(isinstance(m, (Text, MathTex)) for m in mob.get_family())
+            self._built[key] = entry = (mob, layouts)
+            self.builds += 1
+            return mob.copy()
+        self.hits += 1
+        self.layouts_avoided += entry[1]
+        return entry[0].copy()
+
+    def stats(self):
+        return {"builds": self.builds, "hits": self.hits, "layouts_avoided": self.layouts_avoided}
 
 # --- OVERLAY UTILS ---
 def make_equation_overlay():
@@ -203,51 +148,70 @@ def make_highlight_circle(x, y, color=YELLOW):
     circ = manim.Circle(radius=0.15, color=color).move_to((x, y, 0))
     return circ
 
+# --- IMAGE CROSSFADE ---
+# Transform on two ImageMobjects re-interpolates every pixel in floating point on every
+# frame. ImageCrossfade keeps both pixel arrays as uint16 and writes
+# (a * (256 - w) + b * w) >> 8 straight into the image's own pixel array through
+# preallocated buffers, so a frame costs a few integer passes and allocates nothing. The
+# corner points are interpolated the same way Transform would, so the image also moves
+# and resizes to the target's place.
+class ImageCrossfade(manim.Animation):
+    """Drop-in for Transform(image, target) between ImageMobjects of the same pixel size."""
+    def __init__(self, image, target, **kwargs):
+        if image.pixel_array.shape != target.pixel_array.shape:
+            raise ValueError(f"cannot crossfade {image.pixel_array.shape} into {target.pixel_array.shape} pixels")
+        self.target = target
+        super().__init__(image, **kwargs)
+
+    def begin(self):
+        pixels = self.mobject.pixel_array
+        self._start = pixels.astype(np.uint16)
+        self._end = self.target.pixel_array.astype(np.uint16)
+        self._blend = np.empty_like(self._start)
+        self._scratch = np.empty_like(self._start)
+        self._start_points = self.mobject.points.copy()
+        self._delta_points = self.target.points - self._start_points
+        self._points = np.empty_like(self._start_points)
+        super().begin()
+
+    def interpolate_mobject(self, alpha):
+        w = int(round(self.rate_func(alpha) * 256))
+        np.multiply(self._start, 256 - w, out=self._blend)
+        np.multiply(self._end, w, out=self._scratch)
+        self._blend += self._scratch
+        self._blend >>= 8
+        np.copyto(self.mobject.pixel_array, self._blend, casting="unsafe")
+        np.multiply(self._delta_points, self.rate_func(alpha), out=self._points)
+        self._points += self._start_points
+        self.mobject.points[...] = self._points
+
 # --- CAMERA ANIMATION UTILS ---
 def animate_camera(scene, zoom):
     return scene.camera.frame.animate.move_to(manim.ORIGIN).set(width=8/zoom)
 
+def camera_frame_height(zoom):
+    """Height of the camera frame once animate_camera(scene, zoom) has finished."""
+    return (8/zoom) * manim.config.frame_height / manim.config.frame_width
+
+def frame_zoom(zoom, frame_height, image_height):
+    """Zoom of the view that exactly fills a frame_height-tall camera frame centered on an
+    image of the (center, zoom) view drawn image_height tall. Rendering that view at the
+    output pixel size computes only what the camera shows, with no upscaling."""
+    return zoom * image_height / frame_height
+
 # --- FRACTAL RENDERER ---
-class MandelbrotRenderer:
+# The renderers live in fractal_core and produce RGB arrays; these versions wrap each
+# frame in an ImageMobject for the scene.
+class MandelbrotRenderer(fractal_core.MandelbrotRenderer):
     """
     Handles the rendering of the Mandelbrot set with various color schemes and zoom levels.
     """
-    def __init__(self, res=RESOLUTION, max_iter=MAX_ITER):
-        self.res = res
-        self.max_iter = max_iter
-
-    def render(self, center, zoom, color_func=get_smooth_color, **kwargs):
-        arr = np.zeros((self.res, self.res, 3), dtype=np.uint8)
-        scale = 1.5 / zoom
-        histogram = np.zeros(self.max_iter + 1)
-        for x in range(self.res):
-            for y in range(self.res):
-                re = center.real + (x - self.res/2) * scale / (self.res/2)
-                im = center.imag + (y - self.res/2) * scale / (self.res/2)
-                c = complex(re, im)
-                m = mandelbrot(c, self.max_iter)
-                if m < self.max_iter:
-                    histogram[m] += 1
-        total = np.sum(histogram)
-        for x in range(self.res):
-            for y in range(self.res):
-                re = center.real + (x - self.res/2) * scale / (self.res/2)
-                im = center.imag + (y - self.res/2) * scale / (self.res/2)
-                c = complex(re, im)
-                if color_func == get_histogram_color:
-                    m = mandelbrot(c, self.max_iter)
-                    rgb = np.array(color_func(m, self.max_iter, histogram, total)) * 255
-                elif color_func == get_orbit_trap_color:
-                    m, z_trap = mandelbrot_orbit_trap(c, self.max_iter)
-                    rgb = np.array(color_func(m, self.max_iter, z_trap)) * 255
-                elif color_func == get_distance_estimation_color:
-                    m, z, dz = mandelbrot_distance_estimation(c, self.max_iter)
-                    rgb = np.array(color_func(m, self.max_iter, z, dz)) * 255
-                else:
-                    m = mandelbrot(c, self.max_iter)
-                    rgb = np.array(color_func(m, self.max_iter)) * 255
-                arr[y, x] = rgb.astype(np.uint8)
-        return ImageMobject(arr)
+    def make_image(self, rgb):
+        return ImageMobject(rgb)
+
+class JuliaRenderer(fractal_core.JuliaRenderer):
+    def make_image(self, rgb):
+        return ImageMobject(rgb)
 
 def make_zoom_overlay(zoom):
     label = Text("Zoom:", font_size=32).to_corner(manim.UR).shift(0.5*manim.DOWN + 1.5*manim.LEFT)
@@ -267,6 +231,7 @@ def make_funfact_overlay(text):
     return fact
 
 def make_location_label(label, color):
+    color = manim.rgb_to_color(color)  # FAMOUS_LOCATIONS colors are plain RGB
     txt = Text(label, font_size=36, color=color)
     txt.to_edge(manim.UP).shift(0.5*manim.DOWN)
     arrow = Arrow(start=txt.get_bottom(), end=manim.ORIGIN, buff=0.2, color=color)
@@ -281,7 +246,25 @@ class MandelbrotEpic(MovingCameraScene):
     def construct(self):
         # --- Educational overlays at the start ---
         self.add_sound("media/all for nothing.mpeg", gain=0.8)
-        renderer = MandelbrotRenderer(res=RESOLUTION, max_iter=MAX_ITER)
+        renderer = MandelbrotRenderer(res=(manim.config.pixel_height, manim.config.pixel_width), max_iter=MAX_ITER,
+                                      cache=FieldCache(cache_dir=FIELD_CACHE_DIR),
+                                      pyramid=TilePyramid(PYRAMID_DIR) if TOUR_PYRAMID else None)
+        color_algos = [get_smooth_color, get_histogram_color, get_escape_time_color, get_palette_cycle_color, get_orbit_trap_color, get_distance_estimation_color]
+        color_names = ["Smooth Coloring", "Histogram Coloring", "Escape Time", "Palette Cycle", "Orbit Trap", "Distance Estimation"]
+        # Every fractal frame of the tour, in the order construct() shows them, with the height of
+        # the camera frame it is shown in. Each frame is rendered at the output resolution for just
+        # the part of the location's RESOLUTION-square image that the camera frame covers.
+        image_height = ImageMobject(np.zeros((RESOLUTION, RESOLUTION, 3), dtype=np.uint8)).height
+        views = [(FAMOUS_LOCATIONS[0][0], FAMOUS_LOCATIONS[0][1], get_smooth_color, self.camera.frame.height)]
+        views += [(loc[0], loc[1], color_func, camera_frame_height(loc[1]))
+                  for loc in FAMOUS_LOCATIONS[1:] for color_func in color_algos]
+        views.append((FAMOUS_LOCATIONS[-1][0], FAMOUS_LOCATIONS[-1][1], get_histogram_color,
+                      camera_frame_height(FAMOUS_LOCATIONS[-1][1])))
+        schedule = [(center, frame_zoom(zoom, height, image_height), color_func) for center, zoom, color_func, height in views]
+        frame_heights = iter([height for *_, height in views])
+        render_queue = RenderQueue(renderer, schedule)
+        frames = iter(render_queue)
+        overlays = OverlayCache()
         fractal_expl = make_fractal_explanation_overlay()
         self.play(FadeIn(fractal_expl))
         self.wait(2)
@@ -303,42 +286,42 @@ class MandelbrotEpic(MovingCameraScene):
         self.play(FadeIn(escape_overlay))
         self.wait(2)
         self.play(FadeOut(escape_overlay))
-        self.play(FadeIn(make_self_similarity_overlay()))
+        similarity_overlay = make_self_similarity_overlay()
+        self.play(FadeIn(similarity_overlay))
         self.wait(2)
-        self.play(FadeOut(make_self_similarity_overlay()))
-        self.play(FadeIn(make_infinity_overlay()))
+        self.play(FadeOut(similarity_overlay))
+        infinity_overlay = make_infinity_overlay()
+        self.play(FadeIn(infinity_overlay))
         self.wait(2)
-        self.play(FadeOut(make_infinity_overlay()))
+        self.play(FadeOut(infinity_overlay))
         # Initial view
         center, zoom, label, color, highlight = FAMOUS_LOCATIONS[0]
-        mandelbrot_img = renderer.render(center, zoom, color_func=get_smooth_color)
+        mandelbrot_img = ImageMobject(next(frames).result()).scale_to_fit_height(next(frame_heights))
         self.play(FadeIn(mandelbrot_img))
         self.wait(1)
         eq_overlay = make_equation_overlay()
         zoom_overlay, zoom_num = make_zoom_overlay(zoom)
-        coord_overlay = make_coord_overlay(center)
+        coord_overlay = overlays(make_coord_overlay, center)
         iter_overlay, iter_num = make_iter_counter_overlay(MAX_ITER)
         funfact_overlay = make_funfact_overlay("The Mandelbrot set is infinitely complex!")
-        location_label = make_location_label(label, color)
-        zoom_bar = make_zoom_bar(0)
+        location_label = overlays(make_location_label, label, color)
+        zoom_bar = overlays(make_zoom_bar, 0)
         self.play(FadeIn(eq_overlay), FadeIn(zoom_overlay), FadeIn(coord_overlay), FadeIn(iter_overlay), FadeIn(location_label), FadeIn(zoom_bar))
         self.wait(0.5)
         self.play(FadeIn(funfact_overlay))
         self.wait(2)
         self.play(FadeOut(funfact_overlay))
         # --- Tour of Famous Locations with Camera Moves, Highlights, Prompts, and Countdown ---
-        color_algos = [get_smooth_color, get_histogram_color, get_escape_time_color, get_palette_cycle_color, get_orbit_trap_color, get_distance_estimation_color]
-        color_names = ["Smooth Coloring", "Histogram Coloring", "Escape Time", "Palette Cycle", "Orbit Trap", "Distance Estimation"]
         for i, (center, zoom, label, color, highlight) in enumerate(FAMOUS_LOCATIONS[1:], 1):
             for j, color_func in enumerate(color_algos):
-                new_img = renderer.render(center, zoom, color_func=color_func)
-                new_coord = make_coord_overlay(center)
-                new_label = make_location_label(label, color)
-                color_label = make_funfact_overlay(f"Coloring: {color_names[j]}")
-                color_expl = make_coloring_explanation_overlay(color_names[j])
-                zoom_bar_new = make_zoom_bar(i / (len(FAMOUS_LOCATIONS)-1))
+                new_img = ImageMobject(next(frames).result()).scale_to_fit_height(next(frame_heights))
+                new_coord = overlays(make_coord_overlay, center)
+                new_label = overlays(make_location_label, label, color)
+                color_label = overlays(make_funfact_overlay, f"Coloring: {color_names[j]}")
+                color_expl = overlays(make_coloring_explanation_overlay, color_names[j])
+                zoom_bar_new = overlays(make_zoom_bar, i / (len(FAMOUS_LOCATIONS)-1))
                 self.play(
-                    Transform(mandelbrot_img, new_img),
+                    ImageCrossfade(mandelbrot_img, new_img),
                     Transform(coord_overlay, new_coord),
                     zoom_num.animate.set_value(zoom),
                     Transform(location_label, new_label),
@@ -376,11 +359,13 @@ class MandelbrotEpic(MovingCameraScene):
                 self.wait(2)
                 self.play(FadeOut(ff))
         # Final color morph at the end
-        hist_img = renderer.render(center, zoom, color_func=get_histogram_color)
-        self.play(Transform(mandelbrot_img, hist_img), run_time=2)
+        hist_img = ImageMobject(next(frames).result()).scale_to_fit_height(next(frame_heights))
+        render_queue.close()
+        self.play(ImageCrossfade(mandelbrot_img, hist_img), run_time=2)
         self.wait(1)
         self.play(FadeOut(eq_overlay), FadeOut(zoom_overlay), FadeOut(coord_overlay), FadeOut(iter_overlay), FadeOut(location_label), FadeOut(zoom_bar), FadeOut(mandelbrot_img))
         self.wait(0.5)
+        manim.logger.info(f"Overlay cache: {overlays.stats()}")
 
 # To render: manim -pql mandelbrot_julia_dance.py MandelbrotEpic
 
@@ -0,0 +1,194 @@
+# --- Fast Preview Encoder ---
+# Writes an MP4 of the fractal imagery only (no overlays, no Manim scene) by piping raw
+# RGB frames into a local ffmpeg process. Two frame buffers alternate: a writer thread
+# feeds one to ffmpeg while the next frame is rendered into the other, so rendering and
+# encoding overlap. Needs an ffmpeg executable on PATH (or --ffmpeg).
+#
+#   tour  the scene's location tour: every location in every color scheme, crossfading
+#         from one view to the next. Each view fills the frame at its FAMOUS_LOCATIONS
+#         zoom, so the framing differs from the scene's camera moves.
+#   zoom  an exponential zoom into one location (MandelbrotRenderer.zoom_sequence).
+#
+# Usage: python preview.py tour --res 854x480 --fps 30
+#        python preview.py zoom --location 5 --zoom-end 1e5 --seconds 12
+
+import argparse
+import math
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+import fractal_core as core
+from render_stills import SCHEMES, parse_res
+
+CROSSFADE_S = 1.2  # same run_time as the scene's ImageCrossfade between tour views
+HOLD_S = 1.5       # time each tour view stays on screen after its crossfade
+
+class FFmpegPipe:
+    """Encodes (H, W, 3) uint8 frames to a video file through an ffmpeg subprocess.
+
+    Frames are rendered into one of two preallocated buffers (buffer(), then push())
+    while a writer thread hands the other to ffmpeg's stdin."""
+    def __init__(self, path, res, fps, ffmpeg="ffmpeg", crf=23, preset="veryfast"):
+        height, width = core.plane_shape(res)
+        if height % 2 or width % 2:
+            raise ValueError(f"yuv420p output needs an even frame size, got {width}x{height}")
+        self.frames = 0
+        self._proc = subprocess.Popen(
+            [ffmpeg, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgb24",
+             "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+             "-an", "-c:v", "libx264", "-preset", preset, "-crf", str(crf), "-pix_fmt", "yuv420p", path],
+            stdin=subprocess.PIPE)
+        self._free = queue.Queue()
+        self._filled = queue.Queue()
+        for _ in range(2):
+            self._free.put(np.empty((height, width, 3), dtype=np.uint8))
+        self._error = None
+        self._writer = threading.Thread(target=self._write, daemon=True)
+        self._writer.start()
+
+    def _write(self):
+        while True:
+            buf = self._filled.get()
+            if buf is None:
+                return
+            try:
+                self._proc.stdin.write(buf.data)
+            except OSError as exc:
+                self._error = exc
+                return
+            self._free.put(buf)
+
+    def buffer(self):
+        """The next free frame buffer; blocks while ffmpeg still holds both."""
+        while True:
+            if self._error is not None:
+                raise RuntimeError(f"ffmpeg stopped accepting frames: {self._error}")
+            try:
+                return self._free.get(timeout=0.5)
+            except queue.Empty:
+                pass
+
+    def push(self, buf):
+        self._filled.put(buf)
+        self.frames += 1
+
+    def write(self, rgb):
+        buf = self.buffer()
+        np.copyto(buf, rgb)
+        self.push(buf)
+
+    def close(self):
+        self._filled.put(None)
+        self._writer.join()
+        self._proc.stdin.close()
+        if self._proc.wait() != 0 or self._error is not None:
+            raise RuntimeError(f"ffmpeg failed (exit status {self._proc.returncode})")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def smooth(t, inflection=10.0):
+    """manim.rate_functions.smooth, the scene's default rate function, without importing Manim."""
+    error = 1 / (1 + math.exp(inflection / 2))
+    return min(max((1 / (1 + math.exp(-inflection * (t - 0.5))) - error) / (1 - 2 * error), 0), 1)
+
+def crossfade(pipe, start, end, frames):
+    """Writes `frames` frames blending start into end with the same rate function and
+    8-bit integer weights as the scene's ImageCrossfade."""
+    start, end = start.astype(np.uint16), end.astype(np.uint16)
+    blend, scratch = np.empty_like(start), np.empty_like(start)
+    for k in range(1, frames + 1):
+        t = k / frames
+        w = int(round(smooth(t) * 256))
+        np.multiply(start, 256 - w, out=blend)
+        np.multiply(end, w, out=scratch)
+        blend += scratch
+        blend >>= 8
+        buf = pipe.buffer()
+        np.copyto(buf, blend, casting="unsafe")
+        pipe.push(buf)
+
+def hold(pipe, rgb, frames):
+    for _ in range(frames):
+        pipe.write(rgb)
+
+def tour(pipe, renderer, fps):
+    """The scene's tour order: the first location, then every other location in every scheme."""
+    first = core.FAMOUS_LOCATIONS[0]
+    schedule = [(first[0], first[1], core.get_smooth_color)]
+    schedule += [(loc[0], loc[1], color_func) for loc in core.FAMOUS_LOCATIONS[1:] for color_func in SCHEMES.values()]
+    frames = core.RenderQueue(renderer, schedule)
+    try:
+        shown = None
+        for i, future in enumerate(frames, 1):
+            rgb = future.result()
+            if shown is not None:
+                crossfade(pipe, shown, rgb, round(CROSSFADE_S * fps))
+            hold(pipe, rgb, round(HOLD_S * fps))
+            shown = rgb
+            print(f"[{i}/{len(schedule)}] {pipe.frames} frames", end="\r", flush=True)
+    finally:
+        frames.close()
+    print()
+
+def zoom(pipe, renderer, fps, location, zoom_start, zoom_end, seconds, color_func):
+    center = core.FAMOUS_LOCATIONS[location][0]
+    frames = round(seconds * fps)
+    for i, rgb in enumerate(renderer.zoom_sequence(center, zoom_start, zoom_end, frames, color_func), 1):
+        pipe.write(rgb)
+        if i % fps == 0 or i == frames:
+            print(f"[{i}/{frames}]", end="\r", flush=True)
+    print()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Encode a fractal-only preview MP4 without the Manim scene.")
+    parser.add_argument("mode", choices=["tour", "zoom"])
+    parser.add_argument("--res", default="854x480", help='frame size, "WxH" or a square size')
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--max-iter", type=int, default=core.MAX_ITER)
+    parser.add_argument("--location", type=int, default=len(core.FAMOUS_LOCATIONS) - 2,
+                        help="zoom mode: FAMOUS_LOCATIONS index to zoom into")
+    parser.add_argument("--zoom-start", type=float, default=1.0)
+    parser.add_argument("--zoom-end", type=float, default=None, help="zoom mode: default is the location's zoom")
+    parser.add_argument("--seconds", type=float, default=10.0, help="zoom mode: length of the zoom")
+    parser.add_argument("--scheme", default="smooth", help=f"zoom mode: one of {','.join(SCHEMES)}")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes computing each tour field")
+    parser.add_argument("--cache-dir", default=None, help="FieldCache directory to read from and fill (tour mode)")
+    parser.add_argument("--ffmpeg", default="ffmpeg", help="ffmpeg executable")
+    parser.add_argument("--crf", type=int, default=23)
+    parser.add_argument("--out", default=None, help="output file (default: media/preview/<mode>.mp4)")
+    args = parser.parse_args(argv)
+
+    if args.scheme not in SCHEMES:
+        parser.error(f"unknown scheme: {args.scheme}")
+    out = args.out or os.path.join("media", "preview", f"{args.mode}.mp4")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    cache = core.FieldCache(cache_dir=args.cache_dir) if args.cache_dir else None
+    renderer = core.MandelbrotRenderer(parse_res(args.res), args.max_iter, workers=args.workers, cache=cache)
+    start = time.perf_counter()
+    try:
+        with FFmpegPipe(out, renderer.res, args.fps, ffmpeg=args.ffmpeg, crf=args.crf) as pipe:
+            if args.mode == "tour":
+                tour(pipe, renderer, args.fps)
+            else:
+                zoom_end = args.zoom_end or core.FAMOUS_LOCATIONS[args.location][1]
+                zoom(pipe, renderer, args.fps, args.location, args.zoom_start, zoom_end, args.seconds,
+                     SCHEMES[args.scheme])
+    except (OSError, RuntimeError, ValueError) as exc:
+        sys.exit(f"preview failed: {exc}")
+    finally:
+        renderer.close()
+    elapsed = time.perf_counter() - start
+    print(f"wrote {pipe.frames} frames to {out} in {elapsed:.1f}s ({pipe.frames / elapsed:.1f} fps)")
+
+if __name__ == "__main__":
+    main()
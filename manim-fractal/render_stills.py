@@ -0,0 +1,129 @@
+# --- Headless Still Renderer ---
+# Renders FAMOUS_LOCATIONS x color schemes x resolutions straight to PNG (and optionally
+# the raw iteration fields to NPY) without building a Manim scene. Each location and
+# resolution is one job: its field is computed once and colored with every requested
+# scheme. Jobs run in a process pool. With --cache-dir, the fields are also written to a
+# FieldCache directory, which pre-warms the cache for later renders.
+#
+# Usage: python render_stills.py --locations 0,2 --schemes smooth,histogram --res 400,1920x1080
+
+import argparse
+import os
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import fractal_core as core
+
+SCHEMES = {
+    "smooth": core.get_smooth_color,
+    "histogram": core.get_histogram_color,
+    "escape-time": core.get_escape_time_color,
+    "palette-cycle": core.get_palette_cycle_color,
+    "orbit-trap": core.get_orbit_trap_color,
+    "distance": core.get_distance_estimation_color,
+}
+
+def write_png(path, rgb):
+    """Writes a uint8 (H, W, 3) array as an 8-bit RGB PNG."""
+    height, width, _ = rgb.shape
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)  # filter byte 0 before every row
+    raw[:, 1:] = rgb.reshape(height, -1)
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)))
+        f.write(chunk(b"IEND", b""))
+
+def parse_res(text):
+    """"400" is a square view, "1920x1080" is width x height."""
+    if "x" in text:
+        width, height = text.split("x")
+        return int(height), int(width)
+    return int(text)
+
+def slug(text):
+    return "".join(ch if ch.isalnum() else "-" for ch in text.lower()).strip("-")
+
+def render_job(index, res, schemes, max_iter, out_dir, save_field, cache_dir):
+    """Renders one location at one resolution in every scheme; returns the written paths."""
+    center, zoom, label = core.FAMOUS_LOCATIONS[index][:3]
+    cache = core.FieldCache(cache_dir=cache_dir) if cache_dir else None
+    renderer = core.MandelbrotRenderer(res, max_iter, cache=cache)
+    height, width = core.plane_shape(res)
+    stem = os.path.join(out_dir, f"{index:02d}_{slug(label)}_{width}x{height}")
+    field = renderer.compute_field(center, zoom)
+    paths = []
+    if save_field:
+        np.save(stem + "_field.npy", field)
+        paths.append(stem + "_field.npy")
+    for name in schemes:
+        path = f"{stem}_{name}.png"
+        write_png(path, renderer.colorize(field, center, zoom, SCHEMES[name]))
+        paths.append(path)
+    return paths
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render Mandelbrot location stills without Manim scene rendering.")
+    parser.add_argument("--locations", default=None, help="comma-separated FAMOUS_LOCATIONS indices (default: all)")
+    parser.add_argument("--schemes", default=",".join(SCHEMES), help=f"comma-separated subset of {','.join(SCHEMES)}")
+    parser.add_argument("--res", default=str(core.RESOLUTION), help="comma-separated sizes, e.g. 400,1920x1080")
+    parser.add_argument("--max-iter", type=int, default=core.MAX_ITER)
+    parser.add_argument("--out", default="media/stills", help="output directory")
+    parser.add_argument("--npy", action="store_true", help="also save each iteration field as .npy")
+    parser.add_argument("--cache-dir", default=None, help="FieldCache directory to read from and pre-warm")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    args = parser.parse_args(argv)
+
+    schemes = args.schemes.split(",")
+    unknown = set(schemes) - set(SCHEMES)
+    if unknown:
+        parser.error(f"unknown scheme(s): {', '.join(sorted(unknown))}")
+    try:
+        locations = ([int(i) for i in args.locations.split(",")] if args.locations
+                     else list(range(len(core.FAMOUS_LOCATIONS))))
+    except ValueError:
+        parser.error(f"--locations must be comma-separated integers, got {args.locations!r}")
+    bad = [i for i in locations if not 0 <= i < len(core.FAMOUS_LOCATIONS)]
+    if bad:
+        parser.error(f"location index out of range 0-{len(core.FAMOUS_LOCATIONS) - 1}: "
+                     f"{', '.join(map(str, bad))}")
+    resolutions = args.res.split(",")
+    try:
+        for res in resolutions:
+            parse_res(res)
+    except ValueError:
+        parser.error(f"bad --res value: {args.res!r}")
+    os.makedirs(args.out, exist_ok=True)
+
+    jobs = [(index, res) for index in locations for res in resolutions]
+    start = time.perf_counter()
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=core.init_pool_worker) as pool:
+        futures = {pool.submit(render_job, index, parse_res(res), schemes, args.max_iter, args.out, args.npy,
+                               args.cache_dir):
+                   (index, res) for index, res in jobs}
+        for done, future in enumerate(as_completed(futures), 1):
+            index, res = futures[future]
+            label = core.FAMOUS_LOCATIONS[index][2]
+            try:
+                paths = future.result()
+            except Exception as exc:
+                print(f"[{done}/{len(jobs)}] {label} @ {res}: failed: {exc}", file=sys.stderr)
+                failed += 1
+                continue
+            print(f"[{done}/{len(jobs)}] {label} @ {res}: {len(paths)} files "
+                  f"({time.perf_counter() - start:.1f}s elapsed)")
+    if failed:
+        sys.exit(f"{failed} of {len(jobs)} jobs failed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+# --- Import Time Check ---
+# Runs the benchmark's cold-import probe under pytest so the import budget is enforced
+# without running the full benchmark. Usage: python -m pytest test_import_time.py
+
+import os
+import subprocess
+import sys
+
+from benchmark import IMPORT_BUDGET_S, import_seconds
+
+def test_import_within_budget():
+    assert import_seconds() <= IMPORT_BUDGET_S
+
+def test_import_does_not_load_manim():
+    probe = "import sys, fractal_core; print('manim' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    assert out.strip() == "False"